@@ -0,0 +1,107 @@
+"""
+Memory used by MediaInfo records, with dense RelationMaps and, when
+available, with SparseRelationMaps.
+
+Run from the repository root with `python benchmarks/models_memory.py`. To
+compare with the models before they were slotted, check out the parent
+commit of the slots change and run the same script, which then skips the
+SparseRelationMaps case.
+"""
+
+import gc
+import sys
+import tracemalloc
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from librensetsu.models import (  # noqa: E402
+    Date,
+    IdSlugPair,
+    MediaInfo,
+    PictureUrls,
+    RelationMaps,
+)
+
+try:
+    from librensetsu.models import SparseRelationMaps
+except ImportError:  # pragma: no cover
+    SparseRelationMaps = None
+
+RECORDS = 100_000
+
+
+def make(i: int, sparse: bool = False) -> MediaInfo:
+    """
+    Create a record with 3 mappings, a picture and a start date.
+    :param i: Number of the record, used in its values
+    :type i: int
+    :param sparse: Whether to store the mappings as SparseRelationMaps
+    :type sparse: bool, optional
+    :return: The record
+    :rtype: MediaInfo
+    """
+    maps = RelationMaps(
+        anilist=i, myanimelist=i + 1, kitsu=IdSlugPair(id=i, slug=f"s{i}")
+    )
+    return MediaInfo(
+        uuid=f"u{i}",
+        title_display=f"T{i}",
+        title_native=None,
+        title_transliteration=f"T{i}",
+        title_english=None,
+        synonyms=None,
+        is_adult=False,
+        media_type="anime",
+        media_sub_type="tv",
+        year=2000,
+        start_date=Date(year=2000, month=1, day=1),
+        end_date=None,
+        unit_order=None,
+        unit_counts=12,
+        subunit_order=None,
+        subunit_counts=24,
+        volume_order=None,
+        volume_counts=None,
+        season="winter",
+        picture_urls=[PictureUrls(large=f"http://x/{i}.jpg")],
+        country_of_origin="JP",
+        mappings=SparseRelationMaps.from_maps(maps) if sparse else maps,
+    )
+
+
+def measure(sparse: bool) -> int:
+    """
+    Measure the memory allocated to build the records, values included.
+    :param sparse: Whether to store the mappings as SparseRelationMaps
+    :type sparse: bool
+    :return: Number of bytes allocated
+    :rtype: int
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = [make(i, sparse) for i in range(RECORDS)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main() -> None:
+    cases = [False] if SparseRelationMaps is None else [False, True]
+    for sparse in cases:
+        size = measure(sparse)
+        name = "SparseRelationMaps" if sparse else "RelationMaps"
+        print(
+            f"{name:<18} {size / 1e6:7.1f} MB for {RECORDS} records, "
+            f"{size / RECORDS:.0f} B per record"
+        )
+    empty = RelationMaps()
+    size = sys.getsizeof(empty)
+    if hasattr(empty, "__dict__"):
+        size += sys.getsizeof(empty.__dict__)
+    print(f"Empty RelationMaps {size} B")
+
+
+if __name__ == "__main__":
+    main()
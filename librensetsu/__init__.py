@@ -1,3 +1,4 @@
+from .cache import CacheInfo, ResultCache
 from .const import (
     GITHUB_EVENT_NAME,
     GITHUB_WORKSPACE,
@@ -6,8 +7,10 @@ from .const import (
 )
 from .download_unidic import download_unidic
 from .grammar import pluralize
-from .graphql import GraphQL
+from .graphql import AsyncGraphQL, GraphQL, RateLimiter
+from .graphqlbatch import QueryBatcher, merge_queries
 from .humanclock import Season, convert_float_to_time, translate_season
+from .mediatable import MediaInfoRow, MediaInfoTable
 from .models import (
     ConventionalMapping,
     Date,
@@ -15,6 +18,7 @@ from .models import (
     MediaInfo,
     PictureUrls,
     RelationMaps,
+    SparseRelationMaps,
 )
 from .prettyprint import Platform, PrettyPrint, Status, translate_hex_to_rgb
 from .pydanticmodels import ConventionalMapping as pydanticConventionalMapping
@@ -23,24 +27,59 @@ from .pydanticmodels import IdSlugPair as pydanticIdSlugPair
 from .pydanticmodels import MediaInfo as pydanticMediaInfo
 from .pydanticmodels import PictureUrls as pydanticPictureUrls
 from .pydanticmodels import RelationMaps as pydanticRelationMaps
-from .slugify import slugify
-from .transliterate import char_maps, transliterate_no_accent
+from .retry import RetryPolicy
+from .romanizer import Romanizer, configure_romanizer, get_romanizer, warmup_romanizer
+from .scraper import ScraperPool, configure_scraper_pool, get_scraper_pool
+from .script import JAPANESE_RANGES, has_japanese, japanese_segments
+from .slugify import (
+    disable_slugify_cache,
+    enable_slugify_cache,
+    slugify,
+    slugify_many,
+)
+from .transliterate import (
+    CharMapTransliterator,
+    char_maps,
+    compile_char_maps,
+    disable_transliterate_cache,
+    enable_transliterate_cache,
+    transliterate_many,
+    transliterate_no_accent,
+)
 
 __version__ = "0.4.6"
 
 __all__ = [
+    "AsyncGraphQL",
+    "CacheInfo",
     "char_maps",
+    "CharMapTransliterator",
+    "compile_char_maps",
+    "configure_romanizer",
+    "configure_scraper_pool",
     "ConventionalMapping",
     "convert_float_to_time",
     "Date",
+    "disable_slugify_cache",
+    "disable_transliterate_cache",
     "download_unidic",
+    "enable_slugify_cache",
+    "enable_transliterate_cache",
     "GITHUB_EVENT_NAME",
+    "get_romanizer",
+    "get_scraper_pool",
     "GITHUB_WORKSPACE",
+    "has_japanese",
     "GraphQL",
     "IdSlugPair",
     "IS_GITHUB_WORKFLOW_DISPATCH",
     "IS_GITHUB_WORKFLOW",
+    "JAPANESE_RANGES",
+    "japanese_segments",
     "MediaInfo",
+    "MediaInfoRow",
+    "MediaInfoTable",
+    "merge_queries",
     "PictureUrls",
     "Platform",
     "pluralize",
@@ -51,11 +90,21 @@ __all__ = [
     "pydanticMediaInfo",
     "pydanticPictureUrls",
     "pydanticRelationMaps",
+    "QueryBatcher",
+    "RateLimiter",
     "RelationMaps",
+    "ResultCache",
+    "RetryPolicy",
+    "Romanizer",
+    "ScraperPool",
     "Season",
     "slugify",
+    "slugify_many",
+    "SparseRelationMaps",
     "Status",
     "translate_hex_to_rgb",
     "translate_season",
+    "transliterate_many",
     "transliterate_no_accent",
+    "warmup_romanizer",
 ]
@@ -0,0 +1,184 @@
+"""Bounded, thread-safe result cache with optional on-disk persistence"""
+
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+@dataclass
+class CacheInfo:
+    """Statistics of a ResultCache"""
+
+    hits: int
+    """Number of lookups that found a result"""
+    misses: int
+    """Number of lookups that did not find a result"""
+    evictions: int
+    """Number of results dropped to stay within the size limit"""
+    size: int
+    """Number of results currently stored"""
+    maxsize: int
+    """Maximum number of results stored"""
+
+
+class ResultCache(Generic[K, V]):
+    """
+    Least-recently-used cache of function results.
+
+    Keys and values must be JSON-serializable when persisting to disk; tuple
+    keys are restored as tuples.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 65536,
+        path: str | None = None,
+        fingerprint: str | None = None,
+    ) -> None:
+        """
+        Initialize the ResultCache class.
+
+        :param maxsize: Maximum number of results to keep, defaults to 65536
+        :type maxsize: int, optional
+        :param path: JSON file to load the cache from and save it to on exit,
+            defaults to None (memory only)
+        :type path: str | None, optional
+        :param fingerprint: Description of what the results depend on, saved
+            along with them; files saved with another one are not loaded,
+            defaults to None
+        :type fingerprint: str | None, optional
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.path = path
+        self.fingerprint = fingerprint
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if path is not None:
+            if os.path.exists(path):
+                self.load(path)
+            atexit.register(self.save)
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """
+        Get a result and mark it as recently used.
+
+        :param key: The key to look up
+        :type key: K
+        :param default: Value to return if the key is missing, defaults to None
+        :type default: Any, optional
+        :return: The cached result, or the default
+        :rtype: V | Any
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Store a result, evicting the least recently used ones if full.
+
+        :param key: The key to store the result under
+        :type key: K
+        :param value: The result to store
+        :type value: V
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove every result and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Get the statistics of the cache.
+
+        :return: The cache statistics
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, len(self._data), self.maxsize
+            )
+
+    def save(self, path: str | None = None) -> None:
+        """
+        Write the cache to a JSON file, atomically.
+
+        :param path: The file to write to, defaults to the path of the cache
+        :type path: str | None, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the cache to")
+        with self._lock:
+            entries = [[key, value] for key, value in self._data.items()]
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": 1, "fingerprint": self.fingerprint, "entries": entries},
+                file,
+                ensure_ascii=False,
+            )
+        os.replace(tmp, path)
+
+    def load(self, path: str | None = None) -> None:
+        """
+        Add the results stored in a JSON file to the cache, unless they were
+        saved with a different fingerprint.
+
+        :param path: The file to read from, defaults to the path of the cache
+        :type path: str | None, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to load the cache from")
+        with open(path, "r", encoding="utf-8") as file:
+            stored = json.load(file)
+        if stored.get("fingerprint") != self.fingerprint:
+            return
+        for key, value in stored["entries"]:
+            self.put(tuple(key) if isinstance(key, list) else key, value)
+
+    def close(self) -> None:
+        """Save the cache to its path, if any, and stop saving it on exit"""
+        if self.path is not None:
+            atexit.unregister(self.save)
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultCache(maxsize={self.maxsize}, path={self.path!r}, "
+            f"fingerprint={self.fingerprint!r})"
+        )
@@ -2,19 +2,112 @@
 Better Downloader module
 """
 
-from json import loads
-from os.path import exists
+import lzma
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from hashlib import sha256
+from json import dump, load, loads
+from os import remove, replace
+from os.path import exists, getsize
+from threading import Lock
 from time import time
 from traceback import print_exc
-from typing import Any
+from typing import Any, Callable, Iterator, Literal, Mapping
+from urllib.parse import urlparse
 
 import requests as rqp
 from alive_progress import alive_bar as abr
-from cloudscraper import CloudScraper as CSP
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
 from .grammar import pluralize as plz
 from .humanclock import convert_float_to_time as cftt
+from .jsonstream import iter_json_file
+from .mapped import MappedFile
+from .metrics import DownloadMetrics, MetricsSink
 from .prettyprint import PrettyPrint, Status
+from .retry import RetryPolicy
+from .scraper import ScraperPool, get_scraper_pool
+
+
+Compression = Literal["gzip", "xz", "zstd"]
+"""Compression formats the Downloader can decompress while downloading"""
+
+_SUFFIXES: dict[str, Compression] = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+_CONTENT_TYPES: dict[str, Compression] = {
+    "application/gzip": "gzip",
+    "application/x-gzip": "gzip",
+    "application/x-xz": "xz",
+    "application/zstd": "zstd",
+}
+
+
+class _Decompressor:
+    """Incremental decompressor, supporting concatenated streams"""
+
+    def __init__(self, compression: Compression) -> None:
+        """
+        Initialize the _Decompressor class.
+
+        :param compression: The compression format of the data.
+        :type compression: Compression
+        """
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required to decompress zstd data")
+        self.compression = compression
+        self._obj = self._new()
+
+    def _new(self) -> Any:
+        if self.compression == "gzip":
+            # Accept both gzip and zlib headers
+            return zlib.decompressobj(zlib.MAX_WBITS | 32)
+        if self.compression == "xz":
+            return lzma.LZMADecompressor()
+        return zstandard.ZstdDecompressor().decompressobj()  # type: ignore
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress the next chunk of data.
+
+        :param data: The compressed chunk.
+        :type data: bytes
+        :return: The decompressed data available so far.
+        :rtype: bytes
+        """
+        out = []
+        while data:
+            out.append(self._obj.decompress(data))
+            if not self._obj.eof:
+                break
+            data = self._obj.unused_data
+            if data:
+                self._obj = self._new()
+        return b"".join(out)
+
+    def finish(self) -> None:
+        """Check that the data did not end in the middle of a stream."""
+        if not self._obj.eof:
+            raise EOFError(f"Truncated {self.compression} data")
+
+
+def _file_sha256(path: str) -> str:
+    """
+    Hash a file without loading it whole.
+
+    :param path: The file to hash.
+    :type path: str
+    :return: The hex SHA-256 digest of the file.
+    :rtype: str
+    """
+    digest = sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class Downloader:
@@ -29,6 +122,15 @@ class Downloader:
         headers: dict[str, str] = {},
         params: dict[str, str] = {},
         do_not_load: bool = False,
+        segments: int = 1,
+        min_segment_size: int = 4 * 1024 * 1024,
+        conditional: bool = True,
+        compression: Compression | Literal["auto"] | None = "auto",
+        on_progress: Callable[[int], Any] | None = None,
+        retry: RetryPolicy | None = None,
+        metrics: MetricsSink | None = None,
+        scraper_pool: ScraperPool | None = None,
+        resumable: bool = False,
     ) -> None:
         """
         Initialize the Downloader class.
@@ -47,6 +149,36 @@ class Downloader:
         :type params: dict[str, str], optional
         :param do_not_load: Whether to not load the data from local
         :type do_not_load: bool, optional
+        :param segments: Number of byte ranges to download concurrently when
+            the server supports range requests, defaults to 1
+        :type segments: int, optional
+        :param min_segment_size: Minimum size of a byte range in bytes, smaller
+            files use fewer segments, defaults to 4 MiB
+        :type min_segment_size: int, optional
+        :param conditional: Whether to skip the download when the server
+            reports the data unchanged since the last one, defaults to True
+        :type conditional: bool, optional
+        :param compression: Format to decompress the data from while
+            downloading, "auto" to detect it from the Content-Type or the URL
+            suffix, or None to save the data as received, defaults to "auto"
+        :type compression: Compression | Literal["auto"] | None, optional
+        :param on_progress: Function called with the size of every received
+            chunk instead of showing a progress bar, must be thread-safe when
+            downloading in segments, defaults to None
+        :type on_progress: Callable[[int], Any] | None, optional
+        :param retry: When to retry failed downloads, interrupted ones resume
+            where they stopped, defaults to RetryPolicy()
+        :type retry: RetryPolicy | None, optional
+        :param metrics: Function receiving the metrics of every download, eg.
+            a JsonLinesSink or a PrometheusSink, defaults to None
+        :type metrics: MetricsSink | None, optional
+        :param scraper_pool: Sessions to reuse when downloading with
+            CloudScraper, defaults to the process-wide ScraperPool
+        :type scraper_pool: ScraperPool | None, optional
+        :param resumable: Whether to ask for the data without Content-Encoding,
+            so an interrupted download can resume from its partial file, at
+            the cost of more bytes on the wire, defaults to False
+        :type resumable: bool, optional
         """
         self.url = url
         self.headers = headers
@@ -54,6 +186,24 @@ class Downloader:
         self.save_as = save_as
         self.pr = pprint_instance
         self.dnl = do_not_load
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.conditional = conditional
+        self.compression = compression
+        self.on_progress = on_progress
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics
+        self.scraper_pool = scraper_pool
+        self.resumable = resumable
+        self.last_metrics = DownloadMetrics(url, 0.0)
+        """Metrics of the current or last download"""
+        self._request_time = 0.0
+        self.part_path = f"{save_as}.part"
+        """Partial file the data is downloaded to before replacing save_as"""
+        self.meta_path = f"{save_as}.meta.json"
+        """Sidecar file with the validators and hash of save_as"""
+        self.part_meta_path = f"{self.part_path}.meta.json"
+        """Sidecar file with the validators of the partial file"""
 
         if user_agent:
             self.headers["User-Agent"] = user_agent
@@ -69,40 +219,370 @@ class Downloader:
         """
         if self.dnl:
             return ""
-        # check if the file exists
+        self._check_local()
+        with open(self.save_as, "r") as file:
+            return file.read()
+
+    @contextmanager
+    def _progress_bar(self, total: int | None) -> Iterator[Callable[[int], Any]]:
+        """
+        Get the function to report received bytes to, which records them in
+        the metrics and forwards them to the progress bar or on_progress.
+
+        :param total: The expected number of bytes, if known.
+        :type total: int | None
+        :return: A context manager giving the reporting function.
+        :rtype: Iterator[Callable[[int], Any]]
+        """
+        metrics = self.last_metrics
+        with (
+            nullcontext(self.on_progress)
+            if self.on_progress is not None
+            else abr(total=total, unit="B", scale="IEC")  # type: ignore
+        ) as bar:
+
+            def report(size: int) -> None:
+                if metrics.ttfb is None:
+                    metrics.ttfb = time() - self._request_time
+                metrics.bytes += size
+                bar(size)
+
+            yield report
+
+    def _check_local(self) -> None:
+        """Raise FileNotFoundError if the local file does not exist."""
         if not exists(self.save_as):
             self.pr.print(Status.ERR, f"File {self.save_as} does not exist")
             raise FileNotFoundError(f"File {self.save_as} does not exist")
-        with open(self.save_as, "r") as file:
-            return file.read()
 
-    def _unified_resp(self, resp: rqp.Response) -> str:
+    def _read_meta(self, path: str) -> dict[str, Any]:
+        """
+        Read a sidecar metadata file written for the same URL.
+
+        :param path: The sidecar file.
+        :type path: str
+        :return: The metadata, empty if missing, unreadable or for another URL.
+        :rtype: dict[str, Any]
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                meta = load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(meta, dict) or meta.get("url") != self.url:
+            return {}
+        return meta
+
+    def _write_meta(
+        self, path: str, headers: Mapping[str, str], digest: str | None = None
+    ) -> None:
+        """
+        Write the validators of a response to a sidecar metadata file.
+
+        :param path: The sidecar file.
+        :type path: str
+        :param headers: The response headers.
+        :type headers: Mapping[str, str]
+        :param digest: The SHA-256 digest of the data, defaults to None
+        :type digest: str | None, optional
+        """
+        meta = {
+            "url": self.url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "sha256": digest,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            dump(meta, file)
+
+    def _discard_part(self) -> None:
+        """Remove the partial file and its metadata."""
+        for path in (self.part_path, self.part_meta_path):
+            if exists(path):
+                remove(path)
+
+    def _complete(self, headers: Mapping[str, str]) -> None:
+        """
+        Move the finished partial file to save_as and record its validators.
+
+        :param headers: The headers of the response the data came from.
+        :type headers: Mapping[str, str]
+        """
+        replace(self.part_path, self.save_as)
+        if exists(self.part_meta_path):
+            remove(self.part_meta_path)
+        if headers.get("etag") or headers.get("last-modified"):
+            self._write_meta(self.meta_path, headers, _file_sha256(self.save_as))
+        elif exists(self.meta_path):
+            remove(self.meta_path)
+
+    def _conditional_headers(self) -> dict[str, str]:
+        """
+        Build the headers asking the server to only send the data if it
+        changed since the last download, when save_as still holds it.
+
+        :return: The conditional request headers, empty if not applicable.
+        :rtype: dict[str, str]
+        """
+        if not self.conditional or not exists(self.save_as):
+            return {}
+        meta = self._read_meta(self.meta_path)
+        if not meta or meta.get("sha256") != _file_sha256(self.save_as):
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _resume_headers(self, offset: int) -> dict[str, str]:
+        """
+        Build the headers asking for the rest of the partial file, only if the
+        data did not change since it was started.
+
+        :param offset: Size of the partial file in bytes.
+        :type offset: int
+        :return: The range request headers.
+        :rtype: dict[str, str]
+        """
+        headers = {
+            **self.headers,
+            "Range": f"bytes={offset}-",
+            "Accept-Encoding": "identity",
+        }
+        meta = self._read_meta(self.part_meta_path)
+        etag = meta.get("etag")
+        # If-Range only accepts strong entity tags
+        if etag and not etag.startswith("W/"):
+            headers["If-Range"] = etag
+        elif meta.get("last_modified"):
+            headers["If-Range"] = meta["last_modified"]
+        return headers
+
+    def _not_modified(self) -> None:
+        """Keep save_as after the server reported the data unchanged."""
+        self.last_metrics.cache_hit = True
+        self.last_metrics.ttfb = time() - self._request_time
+        self.pr.print(
+            Status.INFO,
+            f"{self.url} not modified since last download, using {self.save_as}",
+        )
+
+    def _detect_compression(self, resp: rqp.Response) -> Compression | None:
+        """
+        Find out which format to decompress the response body from.
+
+        Content-Encoding is already decoded by requests, so only archives
+        served as they are need decompressing. In "auto" mode, they are never
+        decompressed when save_as keeps the archive suffix.
+
+        :param resp: The response object.
+        :type resp: rqp.Response
+        :return: The compression format, or None to save the body as is.
+        :rtype: Compression | None
+        """
+        if self.compression != "auto":
+            return self.compression
+        content_type = resp.headers.get("content-type", "").split(";")[0].strip()
+        path = urlparse(self.url).path
+        detected = _CONTENT_TYPES.get(content_type.lower())
+        for suffix, compression in _SUFFIXES.items():
+            if self.save_as.endswith(suffix):
+                return None
+            if detected is None and path.endswith(suffix):
+                detected = compression
+        return detected
+
+    def _unified_resp(self, resp: rqp.Response, offset: int = 0) -> None:
         """
         Unified response for requests and cloudscraper.
 
+        The data is written to the partial file, which replaces save_as once
+        complete. If the transfer breaks, the partial file is kept so the next
+        download can resume from it, unless the body was content-encoded.
+
         :param resp: The response object.
         :type resp: rqp.Response
-        :return: The downloaded data.
-        :rtype: str
+        :param offset: Number of bytes already in the partial file that the
+            response continues from, defaults to 0
+        :type offset: int, optional
         """
         resp.raise_for_status()
-        dlen = int(resp.headers.get("content-length", 0)) // 1024
-        dlen2 = (dlen + 1) if dlen not in [0, None] else dlen
-        self.pr.print(Status.INFO, f"Downloading from {self.url}")
+        compression = self._detect_compression(resp)
+        decoder = _Decompressor(compression) if compression else None
+        total = int(resp.headers.get("content-length", 0)) or None
+        self.last_metrics.resumed_from = offset
+        if offset:
+            self.pr.print(
+                Status.INFO, f"Resuming download from {self.url} at byte {offset}"
+            )
+        else:
+            self.pr.print(Status.INFO, f"Downloading from {self.url}")
         start_time = time()
         chk = 0
-        with open(self.save_as, "wb") as file, abr(total=dlen2, unit="B", scale="IEC") as bar:  # type: ignore
-            for chunk in resp.iter_content(chunk_size=8192):
-                if chunk:
-                    file.write(chunk)
-                    chk += 1
-                    bar(8192)
+        mode = "ab" if offset else "wb"
+        if not offset:
+            self._write_meta(self.part_meta_path, resp.headers)
+        try:
+            with open(self.part_path, mode) as file, self._progress_bar(total) as bar:
+                for chunk in resp.iter_content(chunk_size=8192):
+                    if chunk:
+                        file.write(decoder.decompress(chunk) if decoder else chunk)
+                        chk += 1
+                        bar(len(chunk))
+                if decoder:
+                    decoder.finish()
+        except Exception:
+            # Decoded data does not line up with the bytes the server sends
+            encoding = resp.headers.get("content-encoding", "identity")
+            if decoder or encoding != "identity":
+                self._discard_part()
+            raise
+        self._complete(resp.headers)
         end_time = time()
         self.pr.print(
             Status.INFO,
             f"Downloaded {plz(chk, 'chunk')} in {cftt(end_time - start_time)}",
         )
-        return self._load_from_local()
+
+    def _probe_ranges(
+        self, get: Callable[..., rqp.Response], conditional: dict[str, str]
+    ) -> rqp.Response:
+        """
+        Check whether the server accepts byte range requests.
+
+        :param get: The GET function of the HTTP client to use.
+        :type get: Callable[..., rqp.Response]
+        :param conditional: Conditional request headers to send along.
+        :type conditional: dict[str, str]
+        :return: The (closed) response to a request for the first byte.
+        :rtype: rqp.Response
+        """
+        headers = {
+            **self.headers,
+            **conditional,
+            "Range": "bytes=0-0",
+            "Accept-Encoding": "identity",
+        }
+        with get(self.url, headers=headers, params=self.params, stream=True) as rsp:
+            return rsp
+
+    def _download_segmented(
+        self, get: Callable[..., rqp.Response], size: int, probe: rqp.Response
+    ) -> None:
+        """
+        Download the data as byte ranges fetched concurrently, each written at
+        its offset in a preallocated file.
+
+        :param get: The GET function of the HTTP client to use.
+        :type get: Callable[..., rqp.Response]
+        :param size: The size of the resource in bytes.
+        :type size: int
+        :param probe: The response to the range probe, for its validators.
+        :type probe: rqp.Response
+        """
+        count = max(1, min(self.segments, size // self.min_segment_size))
+        step = -(-size // count)
+        ranges = [
+            (start, min(start + step, size) - 1) for start in range(0, size, step)
+        ]
+        self.pr.print(
+            Status.INFO,
+            f"Downloading from {self.url} in {plz(len(ranges), 'segment')}",
+        )
+        self.last_metrics.segments = len(ranges)
+        with open(self.part_path, "wb") as file:
+            file.truncate(size)
+        lock = Lock()
+        start_time = time()
+        with self._progress_bar(size) as bar:
+
+            def fetch(first: int, last: int) -> None:
+                headers = {
+                    **self.headers,
+                    "Range": f"bytes={first}-{last}",
+                    "Accept-Encoding": "identity",
+                }
+                with get(
+                    self.url, headers=headers, params=self.params, stream=True
+                ) as rsp, open(self.part_path, "r+b") as file:
+                    if rsp.status_code != 206:
+                        raise rqp.HTTPError(
+                            f"Server ignored range {first}-{last}: {rsp.status_code}",
+                            response=rsp,
+                        )
+                    file.seek(first)
+                    for chunk in rsp.iter_content(chunk_size=65536):
+                        file.write(chunk)
+                        with lock:
+                            bar(len(chunk))
+                    if file.tell() != last + 1:
+                        raise rqp.exceptions.ChunkedEncodingError(
+                            f"Incomplete segment {first}-{last}"
+                        )
+
+            try:
+                with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                    for future in [pool.submit(fetch, *r) for r in ranges]:
+                        future.result()
+            except Exception:
+                # The preallocated file has holes, it can't be resumed from
+                self._discard_part()
+                raise
+        self._complete(probe.headers)
+        self.pr.print(
+            Status.INFO,
+            f"Downloaded {plz(len(ranges), 'segment')} in {cftt(time() - start_time)}",
+        )
+
+    def _fetch(self, get: Callable[..., rqp.Response]) -> None:
+        """
+        Download the data to save_as with the given GET function, in segments
+        when enabled and supported by the server, else as a single stream.
+
+        :param get: The GET function of the HTTP client to use.
+        :type get: Callable[..., rqp.Response]
+        """
+        offset = getsize(self.part_path) if exists(self.part_path) else 0
+        conditional = {} if offset else self._conditional_headers()
+        self._request_time = time()
+        if self.segments > 1 and not offset:
+            probe = self._probe_ranges(get, conditional)
+            self.last_metrics.status = probe.status_code
+            if probe.status_code == 304:
+                return self._not_modified()
+            total = probe.headers.get("content-range", "").rpartition("/")[2]
+            size = int(total) if probe.status_code == 206 and total.isdigit() else 0
+            if (
+                size >= 2 * self.min_segment_size
+                and self._detect_compression(probe) is None
+            ):
+                return self._download_segmented(get, size, probe)
+        if offset:
+            headers = self._resume_headers(offset)
+        else:
+            headers = {**self.headers, **conditional}
+            if self.resumable:
+                # Content-encoded bodies can't be resumed from a partial file
+                headers["Accept-Encoding"] = "identity"
+        with get(self.url, headers=headers, params=self.params, stream=True) as rsp:
+            self.last_metrics.status = rsp.status_code
+            if rsp.status_code == 304 and conditional:
+                return self._not_modified()
+            if offset and (
+                rsp.status_code == 416 or self._detect_compression(rsp) is not None
+            ):
+                # The partial file is stale, already complete, or was saved
+                # without decompressing, start over
+                self._discard_part()
+                return self._fetch(get)
+            content_range = rsp.headers.get("content-range", "")
+            if rsp.status_code != 206 or not content_range.startswith(
+                f"bytes {offset}-"
+            ):
+                offset = 0
+            return self._unified_resp(rsp, offset)
 
     def _unified_exception(self, excepts: Exception) -> None:
         """
@@ -114,38 +594,92 @@ class Downloader:
         self.pr.print(Status.ERR, f"Failed to download data from {self.url}: {excepts}")
         print_exc()
 
-    def _download_with_requests(self) -> str:
+    def _on_retry(self, attempt: int, delay: float) -> None:
         """
-        Download the data using the requests module.
+        Report a failed attempt about to be retried.
 
-        :return: The downloaded data.
-        :rtype: str
+        :param attempt: Number of the next attempt, starting at 1.
+        :type attempt: int
+        :param delay: Seconds to wait before the next attempt.
+        :type delay: float
         """
+        self.last_metrics.retries += 1
+        self.pr.print(
+            Status.WARN,
+            f"Download from {self.url} failed, retrying in {cftt(delay)} "
+            f"(attempt {attempt + 1} of {self.retry.max_attempts})",
+        )
+
+    def _download_with_requests(self) -> None:
+        """Download the data using the requests module."""
         try:
-            with rqp.get(
-                self.url, headers=self.headers, params=self.params, stream=True
-            ) as rsp:
-                return self._unified_resp(rsp)
+            return self.retry.call(lambda: self._fetch(rqp.get), self._on_retry)
         except rqp.exceptions.RequestException as err:
             self._unified_exception(err)
             raise err
 
-    def _download_with_cloudscraper(self) -> str:
+    def _download_with_cloudscraper(self) -> None:
+        """Download the data using the CloudScraper module."""
+        pool = self.scraper_pool
+        if pool is None:
+            pool = get_scraper_pool()
+        try:
+            scraper = pool.get(self.url)
+            lock = pool.lock(self.url)
+
+            def get(url: str, headers: Mapping[str, str], **kwargs: Any) -> Any:
+                # The clearance cookies only hold for the User-Agent of the
+                # session, and solving a challenge mutates the session
+                headers = {
+                    k: v for k, v in headers.items() if k.lower() != "user-agent"
+                }
+                with lock:
+                    return scraper.get(url, headers=headers, **kwargs)
+
+            self.retry.call(lambda: self._fetch(get), self._on_retry)
+            if pool.path is not None:
+                pool.save()
+        except Exception as err:
+            self._unified_exception(err)
+            raise err
+
+    def fetch(self, use_cloudscraper: bool = False) -> str:
         """
-        Download the data using the CloudScraper module.
+        Download the data from the URL to save_as, without loading it nor
+        falling back to the old file on failure.
 
-        :return: The downloaded data.
+        :param use_cloudscraper: Whether to use CloudScraper to bypass Cloudflare protection, defaults to False
+        :type use_cloudscraper: bool, optional
+        :return: The path of the downloaded file.
         :rtype: str
         """
+        metrics = self.last_metrics = DownloadMetrics(self.url, time())
         try:
-            with CSP() as scraper:
-                with scraper.get(
-                    self.url, headers=self.headers, params=self.params, stream=True
-                ) as rsp:
-                    return self._unified_resp(rsp)
+            if use_cloudscraper:
+                self._download_with_cloudscraper()
+            else:
+                self._download_with_requests()
         except Exception as err:
-            self._unified_exception(err)
-            raise err
+            metrics.error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            metrics.duration = time() - metrics.started_at
+            if self.metrics is not None:
+                self.metrics(metrics)
+        return self.save_as
+
+    def _download(self, use_cloudscraper: bool = False) -> None:
+        """
+        Download the data from the URL to save_as, keeping the old file if
+        the download fails.
+
+        :param use_cloudscraper: Whether to use CloudScraper to bypass Cloudflare protection, defaults to False
+        :type use_cloudscraper: bool, optional
+        """
+        try:
+            self.fetch(use_cloudscraper)
+        except Exception:
+            self.pr.print(Status.WARN, "Loading from old downloaded file")
 
     def download(self, use_cloudscraper: bool = False) -> str:
         """
@@ -156,14 +690,8 @@ class Downloader:
         :return: The downloaded data.
         :rtype: str
         """
-        try:
-            if use_cloudscraper:
-                data = self._download_with_cloudscraper()
-            data = self._download_with_requests()
-            return data
-        except Exception:
-            self.pr.print(Status.WARN, "Loading from old downloaded file")
-            return self._load_from_local()
+        self._download(use_cloudscraper)
+        return self._load_from_local()
 
     def json(self, use_cloudscraper: bool = False) -> Any:
         """
@@ -179,6 +707,53 @@ class Downloader:
         self.pr.print(Status.ERR, "File is not a JSON file")
         raise ValueError("File is not a JSON file")
 
+    def iter_json(
+        self, path: str = "item", use_cloudscraper: bool = False
+    ) -> Iterator[Any]:
+        """
+        Download the data from the URL and parse it as JSON incrementally,
+        without loading the whole file in memory.
+
+        :param path: Path of the values to yield, as object keys separated by
+            dots with "item" for each array element, defaults to "item"
+        :type path: str, optional
+        :param use_cloudscraper: Whether to use CloudScraper to bypass Cloudflare protection, defaults to False
+        :type use_cloudscraper: bool, optional
+        :return: The values under the path, one at a time.
+        :rtype: Iterator[Any]
+        """
+        if not self.save_as.endswith(".json"):
+            self.pr.print(Status.ERR, "File is not a JSON file")
+            raise ValueError("File is not a JSON file")
+        self._download(use_cloudscraper)
+        self._check_local()
+        return iter_json_file(self.save_as, path)
+
+    def map_local(self) -> MappedFile:
+        """
+        Memory-map the local file without reading it into memory.
+
+        Use `bytes()` or slices for bytes, `.view` for a zero-copy memoryview
+        and `.text()` for a lazily decoded text view.
+
+        :return: The mapped file, to be closed once done with.
+        :rtype: MappedFile
+        """
+        self._check_local()
+        return MappedFile(self.save_as)
+
+    def download_mapped(self, use_cloudscraper: bool = False) -> MappedFile:
+        """
+        Download the data from the URL and memory-map the downloaded file.
+
+        :param use_cloudscraper: Whether to use CloudScraper to bypass Cloudflare protection, defaults to False
+        :type use_cloudscraper: bool, optional
+        :return: The mapped file, to be closed once done with.
+        :rtype: MappedFile
+        """
+        self._download(use_cloudscraper)
+        return self.map_local()
+
     def __str__(self) -> str:
         return f"Downloader({self.url})"
 
@@ -0,0 +1,185 @@
+"""Concurrent downloads of many files"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from threading import Lock
+from time import time
+from typing import Any, Callable, Iterable
+from urllib.parse import urlparse
+
+from alive_progress import alive_bar as abr
+
+from .downloader import Downloader
+from .grammar import pluralize as plz
+from .humanclock import convert_float_to_time as cftt
+from .metrics import DownloadMetrics, MetricsSink
+from .prettyprint import PrettyPrint, Status
+
+
+@dataclass
+class DownloadJob:
+    """A file to download"""
+
+    url: str
+    """The URL to download from"""
+    save_as: str
+    """The file to save the downloaded data to"""
+    options: dict[str, Any] = field(default_factory=dict)
+    """Keyword arguments passed to the Downloader"""
+    use_cloudscraper: bool = False
+    """Whether to use CloudScraper to bypass Cloudflare protection"""
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a DownloadJob"""
+
+    job: DownloadJob
+    """The job that was run"""
+    path: str | None = None
+    """The downloaded file, None if the download failed"""
+    error: Exception | None = None
+    """The exception that made the download fail, if any"""
+    elapsed: float = 0.0
+    """Seconds spent on the download"""
+    metrics: DownloadMetrics | None = None
+    """Metrics of the download, None if the Downloader could not be created"""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the download succeeded"""
+        return self.error is None
+
+
+JobSpec = DownloadJob | tuple[str, str] | tuple[str, str, dict[str, Any]]
+"""A DownloadJob, or its url, save_as and optionally options as a tuple"""
+
+
+class DownloadManager:
+    """
+    Download many files concurrently, with a limit of simultaneous downloads
+    per host, reporting the progress of every download through one bar.
+    """
+
+    def __init__(
+        self,
+        pprint_instance: PrettyPrint,
+        max_workers: int = 8,
+        per_host: int = 2,
+        metrics: MetricsSink | None = None,
+    ) -> None:
+        """
+        Initialize the DownloadManager class.
+
+        :param pprint_instance: The PrettyPrint instance to use for printing.
+        :type pprint_instance: PrettyPrint
+        :param max_workers: Maximum number of simultaneous downloads, defaults to 8
+        :type max_workers: int, optional
+        :param per_host: Maximum number of simultaneous downloads from the same
+            host, defaults to 2
+        :type per_host: int, optional
+        :param metrics: Function receiving the metrics of every download,
+            unless a job sets its own, defaults to None
+        :type metrics: MetricsSink | None, optional
+        """
+        if max_workers < 1 or per_host < 1:
+            raise ValueError("max_workers and per_host must be positive integers")
+        self.pr = pprint_instance
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.metrics = metrics
+
+    def run(self, jobs: Iterable[JobSpec]) -> list[DownloadResult]:
+        """
+        Download every job, in parallel.
+
+        Failed downloads do not stop the others, their error is stored in
+        their result instead.
+
+        :param jobs: The jobs, or (url, save_as[, options]) tuples.
+        :type jobs: Iterable[JobSpec]
+        :return: The result of every job, in the same order as the jobs.
+        :rtype: list[DownloadResult]
+        """
+        queue = [
+            job if isinstance(job, DownloadJob) else DownloadJob(*job) for job in jobs
+        ]
+        results: list[DownloadResult | None] = [None] * len(queue)
+        running: dict[Future[DownloadResult], tuple[int, str]] = {}
+        active: dict[str, int] = {}
+        received = 0
+        lock = Lock()
+        start_time = time()
+        self.pr.print(Status.INFO, f"Downloading {plz(len(queue), 'file')}")
+
+        with ThreadPoolExecutor(self.max_workers) as pool, abr(
+            len(queue), title="Downloading"
+        ) as bar:  # type: ignore
+
+            def progress(size: int) -> None:
+                nonlocal received
+                with lock:
+                    received += size
+                    bar.text = f"{received / 1048576:.1f} MiB received"
+
+            pending = list(enumerate(queue))
+            while pending or running:
+                # Start the first jobs whose host has a free slot
+                waiting = []
+                for index, job in pending:
+                    host = urlparse(job.url).netloc
+                    if (
+                        len(running) < self.max_workers
+                        and active.get(host, 0) < self.per_host
+                    ):
+                        active[host] = active.get(host, 0) + 1
+                        future = pool.submit(self._run_job, job, progress)
+                        running[future] = (index, host)
+                    else:
+                        waiting.append((index, job))
+                pending = waiting
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, host = running.pop(future)
+                    active[host] -= 1
+                    results[index] = future.result()
+                    bar()
+
+        failed = sum(1 for result in results if result is not None and not result.ok)
+        self.pr.print(
+            Status.WARN if failed else Status.PASS,
+            f"Downloaded {plz(len(queue) - failed, 'file')} ({plz(failed, 'failure')}) "
+            f"in {cftt(time() - start_time)}",
+        )
+        return [result for result in results if result is not None]
+
+    def _run_job(
+        self, job: DownloadJob, progress: Callable[[int], Any]
+    ) -> DownloadResult:
+        """
+        Download a single job.
+
+        :param job: The job to run.
+        :type job: DownloadJob
+        :param progress: Function to report the received bytes to.
+        :type progress: Callable[[int], Any]
+        :return: The result of the job.
+        :rtype: DownloadResult
+        """
+        start_time = time()
+        result = DownloadResult(job)
+        downloader: Downloader | None = None
+        try:
+            downloader = Downloader(
+                self.pr,
+                job.url,
+                job.save_as,
+                **{"metrics": self.metrics, **job.options, "on_progress": progress},
+            )
+            result.path = downloader.fetch(job.use_cloudscraper)
+        except Exception as err:
+            result.error = err
+        if downloader is not None:
+            result.metrics = downloader.last_metrics
+        result.elapsed = time() - start_time
+        return result
@@ -1,4 +1,14 @@
-from typing import Any
+import io
+import json
+from dataclasses import fields, is_dataclass
+from typing import IO, Any, Callable, Iterable
+
+from .models import SparseRelationMaps
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 
 def remove_empty_keys(data: dict[str, Any] | list[Any] | Any) -> Any:
@@ -16,3 +26,128 @@ def remove_empty_keys(data: dict[str, Any] | list[Any] | Any) -> Any:
     elif isinstance(data, list):
         return [remove_empty_keys(v) for v in data if v not in (None, [], {})]
     return data
+
+
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (list, dict)) and not value)
+
+
+def to_json_data(data: Any) -> Any:
+    """
+    Convert dataclasses to dicts, leaving out any None, empty dict, or empty
+    list, in a single pass.
+
+    Gives the same result as `remove_empty_keys(asdict(data))`, without
+    deep-copying the values to an intermediate tree first. SparseRelationMaps
+    objects are converted like the RelationMaps they stand for.
+    :param data: Data to convert
+    :type data: Any
+    :return: Data made of dicts, lists and scalars only
+    :rtype: Any
+    """
+    cls = type(data)
+    if cls in _SCALARS:
+        return data
+    if cls is list or cls is tuple:
+        return [to_json_data(v) for v in data if not _is_empty(v)]
+    if cls is dict or cls is SparseRelationMaps:
+        return {k: to_json_data(v) for k, v in data.items() if not _is_empty(v)}
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        if not is_dataclass(data):
+            return data
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(data))
+    result = {}
+    for name in names:
+        value = getattr(data, name)
+        if not _is_empty(value):
+            result[name] = to_json_data(value)
+    return result
+
+
+def _dumps_bytes(data: Any, indent: int | None = None) -> bytes:
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    separators = (",", ":") if indent is None else None
+    return json.dumps(
+        data, ensure_ascii=False, indent=indent, separators=separators
+    ).encode("utf-8")
+
+
+def dumps(data: Any, indent: int | None = None) -> str:
+    """
+    Serialize dataclasses to JSON, leaving out any None, empty dict, or empty
+    list, see `to_json_data`.
+
+    Uses orjson when installed, unless an indent other than 2 is asked for.
+    :param data: Data to serialize
+    :type data: Any
+    :param indent: Number of spaces to indent with, defaults to None (compact)
+    :type indent: int | None, optional
+    :return: JSON document
+    :rtype: str
+    """
+    return _dumps_bytes(to_json_data(data), indent).decode("utf-8")
+
+
+def _writer(fp: IO[Any]) -> Callable[[bytes], Any]:
+    """
+    Get a function writing UTF-8 encoded JSON to a text or a bytes stream.
+    :param fp: Stream to write to
+    :type fp: IO[Any]
+    :return: Function taking the bytes to write
+    :rtype: Callable[[bytes], Any]
+    """
+    binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or (
+        not isinstance(fp, io.TextIOBase) and "b" in getattr(fp, "mode", "")
+    )
+    if binary:
+        return fp.write
+    return lambda chunk: fp.write(chunk.decode("utf-8"))
+
+
+def dump(data: Any, fp: IO[Any], indent: int | None = None) -> None:
+    """
+    Serialize dataclasses to JSON, see `dumps`, and write it to a stream.
+    :param data: Data to serialize
+    :type data: Any
+    :param fp: Text or bytes stream to write to
+    :type fp: IO[Any]
+    :param indent: Number of spaces to indent with, defaults to None (compact)
+    :type indent: int | None, optional
+    """
+    _writer(fp)(_dumps_bytes(to_json_data(data), indent))
+
+
+def dump_many(records: Iterable[Any], fp: IO[Any], lines: bool = False) -> int:
+    """
+    Serialize dataclasses one by one to a stream, see `dumps`, without
+    building the whole document in memory.
+    :param records: Data to serialize
+    :type records: Iterable[Any]
+    :param fp: Text or bytes stream to write to
+    :type fp: IO[Any]
+    :param lines: Whether to write JSON lines instead of a JSON array,
+        defaults to False
+    :type lines: bool, optional
+    :return: Number of records written
+    :rtype: int
+    """
+    write = _writer(fp)
+    count = 0
+    if not lines:
+        write(b"[")
+    for record in records:
+        chunk = _dumps_bytes(to_json_data(record))
+        if lines:
+            write(chunk + b"\n")
+        else:
+            write(chunk if count == 0 else b"," + chunk)
+        count += 1
+    if not lines:
+        write(b"]")
+    return count
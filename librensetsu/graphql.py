@@ -1,24 +1,126 @@
-import os.path as path
-from typing import Any
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha256
+from types import TracebackType
+from typing import Any, Iterable, Iterator, Mapping
 
 import requests as req
+from requests.adapters import HTTPAdapter
+
+from .retry import RetryPolicy, parse_retry_after
+
+_query_documents: dict[str, tuple[int, str]] = {}
+"""Query documents read from files, with the modification time they had"""
+_query_documents_lock = threading.Lock()
+
+_PERSISTED_QUERY_NOT_FOUND = {"PERSISTED_QUERY_NOT_FOUND", "PersistedQueryNotFound"}
+"""Error codes and messages of servers that do not know a query hash"""
+_PERSISTED_QUERY_NOT_SUPPORTED = {
+    "PERSISTED_QUERY_NOT_SUPPORTED",
+    "PersistedQueryNotSupported",
+}
+"""Error codes and messages of servers without persisted queries"""
+
+
+def _read_query_file(file: str) -> str:
+    """
+    Read a GraphQL query document from a file, reusing the previous read
+    until the file is modified.
+    :param file: The file containing the query.
+    :type file: str
+    :return: The query.
+    :rtype: str
+    """
+    key = os.path.abspath(file)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File '{file}' not found.") from None
+    cached = _query_documents.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(key, "r") as f:
+        query = f.read()
+    with _query_documents_lock:
+        _query_documents[key] = (mtime, query)
+    return query
+
+
+def clear_query_cache() -> None:
+    """Forget the query documents read from files."""
+    with _query_documents_lock:
+        _query_documents.clear()
+
+
+@lru_cache(maxsize=256)
+def _query_hash(query: str) -> str:
+    return sha256(query.encode("utf-8")).hexdigest()
 
 
 class GraphQL:
     """
     A class to handle GraphQL queries.
+
+    Queries share a pooled, keep-alive session, so paginating over an API
+    reuses connections instead of opening a new one for every request. Use it
+    as a context manager, or call `close`, to release the connections.
     """
 
-    def __init__(self, url: str, headers: dict[str, str] | None = None) -> None:
+    def __init__(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] | None = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        session: req.Session | None = None,
+        persisted_queries: bool = False,
+        retry: RetryPolicy | None = None,
+    ) -> None:
         """
         Constructor for the GraphQL class.
         :param url: The URL of the GraphQL API.
         :type url: str
         :param headers: The headers to be sent with the request.
         :type headers: dict[str, str], optional
+        :param timeout: Timeout of a request in seconds, or a (connect, read)
+            tuple, defaults to None (wait forever)
+        :type timeout: float | tuple[float, float] | None, optional
+        :param pool_connections: Number of hosts to keep connection pools
+            for, defaults to 10
+        :type pool_connections: int, optional
+        :param pool_maxsize: Maximum number of connections kept alive per
+            host, defaults to 10
+        :type pool_maxsize: int, optional
+        :param session: Session to send the requests with instead of creating
+            one, it is not closed by `close`, defaults to None
+        :type session: requests.Session | None, optional
+        :param persisted_queries: Send the sha256 hash of queries instead of
+            their text (automatic persisted queries), falling back to the full
+            query when the server does not know the hash, defaults to False
+        :type persisted_queries: bool, optional
+        :param retry: When to retry failed requests, defaults to RetryPolicy()
+        :type retry: RetryPolicy | None, optional
         """
         self.url = url
         self.headers = headers
+        self.timeout = timeout
+        self.persisted_queries = persisted_queries
+        self.retry = retry or RetryPolicy()
+        self._owns_session = session is None
+        if session is None:
+            session = req.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.session = session
 
     def query(self, query: str, variables: dict[str, Any] = {}) -> dict[str, Any]:
         """
@@ -30,14 +132,85 @@ class GraphQL:
         :return: The response from the API.
         :rtype: dict[str, Any]
         """
-        response = req.post(
-            self.url,
-            json={"query": query, "variables": variables},
-            headers=self.headers,
-        )
+        if self.persisted_queries:
+            response = self._post(self._payload(query, variables, False))
+            if not self._is_persisted_query_miss(response):
+                response.raise_for_status()
+                return response.json()
+        response = self._post(self._payload(query, variables))
         response.raise_for_status()
         return response.json()
 
+    def _payload(
+        self, query: str, variables: dict[str, Any], send_query: bool = True
+    ) -> dict[str, Any]:
+        """
+        Build the JSON payload of a query.
+        :param query: The query to be sent.
+        :type query: str
+        :param variables: The variables to be sent with the query.
+        :type variables: dict[str, Any]
+        :param send_query: Whether to include the query text, defaults to True
+        :type send_query: bool, optional
+        :return: The payload.
+        :rtype: dict[str, Any]
+        """
+        payload: dict[str, Any] = {"variables": variables}
+        if send_query:
+            payload["query"] = query
+        if self.persisted_queries:
+            payload["extensions"] = {
+                "persistedQuery": {"version": 1, "sha256Hash": _query_hash(query)}
+            }
+        return payload
+
+    def _is_persisted_query_miss(self, response: req.Response) -> bool:
+        """
+        Check whether the server asks for the full query of a persisted query,
+        and stop using persisted queries if the server does not support them.
+        :param response: The response to a hash-only request.
+        :type response: requests.Response
+        :return: Whether the query has to be sent in full.
+        :rtype: bool
+        """
+        try:
+            errors = response.json().get("errors") or []
+        except (ValueError, AttributeError):
+            return False
+        for error in errors:
+            if not isinstance(error, dict):
+                continue
+            code = (error.get("extensions") or {}).get("code")
+            reasons = {code, error.get("message")}
+            if reasons & _PERSISTED_QUERY_NOT_SUPPORTED:
+                self.persisted_queries = False
+                return True
+            if reasons & _PERSISTED_QUERY_NOT_FOUND:
+                return True
+        return False
+
+    def _post(self, payload: Any) -> req.Response:
+        """
+        Send a payload to the GraphQL API, retrying transient failures.
+        :param payload: The JSON payload to be sent.
+        :type payload: Any
+        :return: The raw response from the API.
+        :rtype: requests.Response
+        """
+        return self.retry.call(lambda: self._post_once(payload))
+
+    def _post_once(self, payload: Any) -> req.Response:
+        """
+        Send a payload to the GraphQL API, once.
+        :param payload: The JSON payload to be sent.
+        :type payload: Any
+        :return: The raw response from the API.
+        :rtype: requests.Response
+        """
+        return self.session.post(
+            self.url, json=payload, headers=self.headers, timeout=self.timeout
+        )
+
     def query_from_file(
         self, file: str, variables: dict[str, Any] = {}
     ) -> dict[str, Any]:
@@ -50,8 +223,336 @@ class GraphQL:
         :return: The response from the API.
         :rtype: dict[str, Any]
         """
-        if not path.exists(file):
-            raise FileNotFoundError(f"File '{file}' not found.")
-        with open(file, "r") as f:
-            query = f.read()
-        return self.query(query, variables)
+        return self.query(_read_query_file(file), variables)
+
+    def paginate(
+        self,
+        query: str,
+        path: str,
+        items: str,
+        variables: dict[str, Any] = {},
+        page_variable: str = "page",
+        cursor_variable: str = "after",
+        max_pages: int | None = None,
+        prefetch: bool = True,
+    ) -> Iterator[Any]:
+        """
+        Iterate over the items of a paginated query, page after page.
+
+        Supports AniList-style pages, where the connection's `pageInfo` has
+        `currentPage`, and Relay-style cursors, where it has `endCursor`.
+        Both need `hasNextPage`. While the items of a page are consumed, the
+        next page is already being fetched in the background.
+        :param query: The query to be sent, taking the page number or cursor
+            as a variable.
+        :type query: str
+        :param path: Dot-separated path from `data` to the object holding
+            `pageInfo`, e.g. "Page".
+        :type path: str
+        :param items: Key of the item list in that object, e.g. "media". Items
+            of a list called "edges" are unwrapped to their "node".
+        :type items: str
+        :param variables: The other variables to be sent with the query.
+        :type variables: dict[str, Any], optional
+        :param page_variable: Name of the page number variable, defaults to "page"
+        :type page_variable: str, optional
+        :param cursor_variable: Name of the cursor variable, defaults to "after"
+        :type cursor_variable: str, optional
+        :param max_pages: Maximum number of pages to fetch, defaults to None
+        :type max_pages: int | None, optional
+        :param prefetch: Whether to fetch the next page in the background,
+            defaults to True
+        :type prefetch: bool, optional
+        :return: The items, one by one.
+        :rtype: Iterator[Any]
+        """
+        variables = dict(variables)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending: Future[dict[str, Any]] | None = None
+        fetched = 0
+        try:
+            response = self.query(query, variables)
+            while True:
+                fetched += 1
+                data = response.get("data")
+                if data is None:
+                    raise ValueError(f"GraphQL query failed: {response.get('errors')}")
+                for key in path.split("."):
+                    data = data[key]
+                info = data["pageInfo"]
+                has_next = bool(info.get("hasNextPage")) and (
+                    max_pages is None or fetched < max_pages
+                )
+                if has_next:
+                    if "endCursor" in info:
+                        variables[cursor_variable] = info["endCursor"]
+                    else:
+                        variables[page_variable] = info["currentPage"] + 1
+                    if executor is not None:
+                        pending = executor.submit(self.query, query, dict(variables))
+                for item in data[items] or []:
+                    yield item["node"] if items == "edges" else item
+                if not has_next:
+                    return
+                if pending is not None:
+                    response, pending = pending.result(), None
+                else:
+                    response = self.query(query, variables)
+        finally:
+            if executor is not None:
+                if pending is not None:
+                    pending.cancel()
+                executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """
+        Close the connections of the session, if it was created by this
+        instance.
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "GraphQL":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by concurrent requests to one API.
+
+    The bucket starts from the configured budget, or unlimited, and is
+    adjusted from the `X-RateLimit-*` and `Retry-After` headers of every
+    response, so requests go out as fast as the API allows without tripping
+    its limit. Give the budget of APIs known to limit requests, eg.
+    `RateLimiter(90)` for AniList, so the first requests are paced as well.
+    """
+
+    def __init__(self, limit: int | None = None, period: float = 60.0) -> None:
+        """
+        Initialize the RateLimiter class.
+        :param limit: Number of requests allowed per period, defaults to None
+            (unlimited until a response sends X-RateLimit-Limit)
+        :type limit: int | None, optional
+        :param period: Length of the period in seconds, defaults to 60.0
+        :type period: float, optional
+        """
+        self.limit = limit
+        self.period = period
+        self.tokens = float(limit or 0)
+        self.resume_at = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.limit is None:
+            self._updated = now
+            return
+        rate = self.limit / self.period
+        self.tokens = min(self.limit, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent, and take a token for it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                delay = self.resume_at - time.monotonic()
+                if delay <= 0:
+                    if self.limit is None:
+                        return
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) * self.period / self.limit
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while.
+        :param seconds: How long to pause, in seconds.
+        :type seconds: float
+        """
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Adjust the bucket from the rate-limit headers of a response.
+        :param headers: The response headers.
+        :type headers: Mapping[str, str]
+        """
+        self._refill()
+        limit = headers.get("X-RateLimit-Limit")
+        if limit and limit.isdigit() and int(limit) > 0:
+            if self.limit is None:
+                # Start limiting from the first response announcing a budget
+                self.tokens = float(limit)
+            self.limit = int(limit)
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining and remaining.isdigit():
+            self.tokens = min(self.tokens, float(remaining))
+            reset = headers.get("X-RateLimit-Reset")
+            if int(remaining) == 0 and reset and reset.isdigit():
+                self.pause(int(reset) - time.time())
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is not None:
+            self.pause(retry_after)
+
+
+class AsyncGraphQL:
+    """
+    An asyncio counterpart of the GraphQL class.
+
+    Requests run on worker threads over a shared pooled session, at most
+    `concurrency` at once, and are paced by a RateLimiter.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        concurrency: int = 5,
+        rate_limiter: RateLimiter | None = None,
+        timeout: float | tuple[float, float] | None = None,
+        persisted_queries: bool = False,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        """
+        Constructor for the AsyncGraphQL class.
+        :param url: The URL of the GraphQL API.
+        :type url: str
+        :param headers: The headers to be sent with the request.
+        :type headers: dict[str, str], optional
+        :param concurrency: Maximum number of requests in flight, defaults to 5
+        :type concurrency: int, optional
+        :param rate_limiter: Token bucket to pace the requests with, share one
+            between clients of the same API, defaults to a new RateLimiter
+            that only limits once the API sends rate-limit headers
+        :type rate_limiter: RateLimiter | None, optional
+        :param timeout: Timeout of a request in seconds, or a (connect, read)
+            tuple, defaults to None (wait forever)
+        :type timeout: float | tuple[float, float] | None, optional
+        :param persisted_queries: Send the sha256 hash of queries instead of
+            their text, see GraphQL, defaults to False
+        :type persisted_queries: bool, optional
+        :param retry: When to retry failed requests, defaults to RetryPolicy()
+        :type retry: RetryPolicy | None, optional
+        """
+        self.client = GraphQL(
+            url,
+            headers,
+            timeout,
+            pool_maxsize=max(concurrency, 10),
+            persisted_queries=persisted_queries,
+        )
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry = retry or RetryPolicy()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(self, payload: Any) -> req.Response:
+        """
+        Send a payload once a concurrency slot and a token are available,
+        retrying failed requests.
+
+        Rate-limited requests pause the whole RateLimiter, so the other
+        requests in flight back off as well.
+        :param payload: The JSON payload to be sent.
+        :type payload: Any
+        :return: The raw response from the API.
+        :rtype: requests.Response
+        """
+        limiter = self.rate_limiter
+        retry = self.retry
+        attempt = 0
+        async with self._semaphore:
+            while True:
+                await limiter.acquire()
+                try:
+                    response = await asyncio.to_thread(self.client._post_once, payload)
+                except Exception as err:
+                    if not retry.should_retry(attempt, error=err):
+                        raise
+                    await asyncio.sleep(retry.delay(attempt))
+                    attempt += 1
+                    continue
+                limiter.update(response.headers)
+                if not retry.should_retry(attempt, response):
+                    return response
+                if response.status_code == 429:
+                    limiter.pause(retry.delay(attempt, response))
+                else:
+                    await asyncio.sleep(retry.delay(attempt, response))
+                attempt += 1
+
+    async def query(
+        self, query: str, variables: dict[str, Any] = {}
+    ) -> dict[str, Any]:
+        """
+        Send a query to the GraphQL API.
+        :param query: The query to be sent.
+        :type query: str
+        :param variables: The variables to be sent with the query.
+        :type variables: dict[str, Any], optional
+        :return: The response from the API.
+        :rtype: dict[str, Any]
+        """
+        client = self.client
+        if client.persisted_queries:
+            response = await self._send(client._payload(query, variables, False))
+            if not client._is_persisted_query_miss(response):
+                response.raise_for_status()
+                return response.json()
+        response = await self._send(client._payload(query, variables))
+        response.raise_for_status()
+        return response.json()
+
+    async def query_from_file(
+        self, file: str, variables: dict[str, Any] = {}
+    ) -> dict[str, Any]:
+        """
+        Send a query to the GraphQL API from a file.
+        :param file: The file containing the query.
+        :type file: str
+        :param variables: The variables to be sent with the query.
+        :type variables: dict[str, Any], optional
+        :return: The response from the API.
+        :rtype: dict[str, Any]
+        """
+        return await self.query(_read_query_file(file), variables)
+
+    async def gather_queries(
+        self, query: str, variables: Iterable[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Send the same query with many sets of variables concurrently.
+        :param query: The query to be sent.
+        :type query: str
+        :param variables: The variables of every request.
+        :type variables: Iterable[dict[str, Any]]
+        :return: The responses from the API, in the same order as the variables.
+        :rtype: list[dict[str, Any]]
+        """
+        return await asyncio.gather(*(self.query(query, v) for v in variables))
+
+    async def close(self) -> None:
+        """Close the connections of the session."""
+        self.client.close()
+
+    async def __aenter__(self) -> "AsyncGraphQL":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
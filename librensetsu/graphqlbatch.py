@@ -0,0 +1,391 @@
+"""Batching of GraphQL queries into fewer HTTP requests"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Literal
+
+import requests as req
+
+from .graphql import GraphQL
+
+_STRING_OR_COMMENT = re.compile(r'"""[\s\S]*?"""|"(?:\\.|[^"\\])*"|#[^\n]*')
+_VARIABLE = re.compile(r'("""[\s\S]*?"""|"(?:\\.|[^"\\])*")|\$(\w+)')
+_NAME = re.compile(r"[_A-Za-z]\w*")
+
+
+def _strip_comments(document: str) -> str:
+    return _STRING_OR_COMMENT.sub(
+        lambda match: "" if match.group().startswith("#") else match.group(),
+        document,
+    )
+
+
+def _skip_block(document: str, start: int) -> int:
+    """
+    Find the end of the bracketed block opening at `start`.
+    :param document: The GraphQL document
+    :type document: str
+    :param start: Index of the opening bracket
+    :type start: int
+    :return: Index right after the matching closing bracket
+    :rtype: int
+    """
+    pairs = {"{": "}", "(": ")", "[": "]"}
+    stack: list[str] = []
+    index = start
+    while index < len(document):
+        char = document[index]
+        if char == '"':
+            match = _STRING_OR_COMMENT.match(document, index)
+            if match is None:
+                raise ValueError("Unterminated string in GraphQL document")
+            index = match.end()
+            continue
+        if char in pairs:
+            stack.append(pairs[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                return index + 1
+        index += 1
+    raise ValueError("Unbalanced brackets in GraphQL document")
+
+
+def _skip_space(document: str, index: int) -> int:
+    while index < len(document) and document[index] in " \t\r\n,\ufeff":
+        index += 1
+    return index
+
+
+def _split_definitions(document: str) -> tuple[str, list[str]]:
+    """
+    Split a document into its query operation and its fragment definitions.
+    :param document: The GraphQL document, without comments
+    :type document: str
+    :return: The operation and the fragments
+    :rtype: tuple[str, list[str]]
+    """
+    operations: list[str] = []
+    fragments: list[str] = []
+    index = _skip_space(document, 0)
+    while index < len(document):
+        brace = document.find("{", index)
+        paren = document.find("(", index)
+        if brace == -1:
+            raise ValueError("Missing selection set in GraphQL document")
+        if paren != -1 and paren < brace:
+            brace = document.find("{", _skip_block(document, paren))
+        end = _skip_block(document, brace)
+        definition = document[index:end].strip()
+        if definition.startswith("fragment"):
+            fragments.append(definition)
+        else:
+            operations.append(definition)
+        index = _skip_space(document, end)
+    if len(operations) != 1:
+        raise ValueError("Only documents with exactly one operation can be batched")
+    return operations[0], fragments
+
+
+def _rename_variables(text: str, prefix: str) -> str:
+    return _VARIABLE.sub(
+        lambda match: match.group(1) or f"${prefix}{match.group(2)}", text
+    )
+
+
+@dataclass
+class MergedQuery:
+    """Several queries merged into a single aliased document"""
+
+    query: str
+    """The merged query document"""
+    variables: dict[str, Any]
+    """The variables of every query, renamed with the prefix of their query"""
+    aliases: list[dict[str, str]] = field(default_factory=list)
+    """For every query, its top-level fields by their alias in the merged document"""
+
+    def split(self, response: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Split the response to the merged query into the response to each query.
+        :param response: The response to the merged query
+        :type response: dict[str, Any]
+        :return: The responses, in the order the queries were merged
+        :rtype: list[dict[str, Any]]
+        """
+        data = response.get("data")
+        errors = response.get("errors") or []
+        results: list[dict[str, Any]] = []
+        for aliases in self.aliases:
+            result: dict[str, Any] = {
+                "data": None
+                if data is None
+                else {name: data.get(alias) for alias, name in aliases.items()}
+            }
+            own_errors = []
+            for error in errors:
+                path = error.get("path") or []
+                if not path:
+                    own_errors.append(error)
+                elif path[0] in aliases:
+                    path = [aliases[path[0]], *path[1:]]
+                    own_errors.append({**error, "path": path})
+            if own_errors:
+                result["errors"] = own_errors
+            results.append(result)
+        return results
+
+
+def merge_queries(queries: list[tuple[str, dict[str, Any]]]) -> MergedQuery:
+    """
+    Merge queries into one document, aliasing their top-level fields and
+    renaming their variables so they do not collide.
+
+    Only single-operation `query` documents whose top-level selections are
+    plain fields are supported; fragments may not use variables.
+    :param queries: The queries and their variables
+    :type queries: list[tuple[str, dict[str, Any]]]
+    :return: The merged query
+    :rtype: MergedQuery
+    """
+    definitions: list[str] = []
+    selections: list[str] = []
+    variables: dict[str, Any] = {}
+    fragments: dict[str, None] = {}
+    merged = MergedQuery("", variables)
+    for number, (query, values) in enumerate(queries):
+        prefix = f"q{number}_"
+        operation, own_fragments = _split_definitions(_strip_comments(query))
+        for fragment in own_fragments:
+            if "$" in _STRING_OR_COMMENT.sub("", fragment):
+                raise ValueError("Fragments using variables can't be batched")
+            fragments[fragment] = None
+        brace = operation.find("{")
+        paren = operation.find("(")
+        if paren != -1 and paren < brace:
+            end = _skip_block(operation, paren)
+            brace = operation.find("{", end)
+            header = operation[:paren].split()
+            declared = operation[paren + 1 : end - 1]
+            definitions.append(_rename_variables(declared, prefix))
+            for match in _VARIABLE.finditer(declared):
+                if match.group(2) in values:
+                    variables[prefix + match.group(2)] = values[match.group(2)]
+        else:
+            header = operation[:brace].split()
+        if header and header[0] != "query":
+            raise ValueError(f"Only queries can be batched, not {header[0]}")
+        body = _rename_variables(operation[brace + 1 : -1], prefix)
+        aliases: dict[str, str] = {}
+        index = _skip_space(body, 0)
+        while index < len(body):
+            match = _NAME.match(body, index)
+            if match is None:
+                raise ValueError("Only plain top-level fields can be batched")
+            name = alias = match.group()
+            start = match.end()
+            index = _skip_space(body, start)
+            if body.startswith(":", index):
+                match = _NAME.match(body, _skip_space(body, index + 1))
+                if match is None:
+                    raise ValueError("Malformed alias in GraphQL document")
+                name = match.group()
+                start = match.end()
+                index = _skip_space(body, start)
+            if body.startswith("(", index):
+                index = _skip_space(body, _skip_block(body, index))
+            while body.startswith("@", index):
+                match = _NAME.match(body, index + 1)
+                if match is None:
+                    raise ValueError("Malformed directive in GraphQL document")
+                index = _skip_space(body, match.end())
+                if body.startswith("(", index):
+                    index = _skip_space(body, _skip_block(body, index))
+            if body.startswith("{", index):
+                index = _skip_space(body, _skip_block(body, index))
+            aliases[prefix + alias] = alias
+            selections.append(f"{prefix}{alias}: {name}{body[start:index].rstrip()}")
+        merged.aliases.append(aliases)
+    header = f"query Batch({', '.join(definitions)})" if definitions else "query Batch"
+    merged.query = "\n".join(
+        [f"{header} {{\n  " + "\n  ".join(selections) + "\n}", *fragments]
+    )
+    return merged
+
+
+_Job = tuple[str, dict[str, Any], "Future[dict[str, Any]]"]
+
+
+class QueryBatcher:
+    """
+    Collects queries sent within a short window and sends them together.
+
+    Queued queries are merged into one aliased document ("alias" mode), or
+    sent as a JSON array to servers supporting batched requests ("array"
+    mode), and each caller gets the part of the response that belongs to its
+    query through a future. Batches the server refuses with a client error
+    are sent again as separate queries.
+    """
+
+    def __init__(
+        self,
+        client: GraphQL,
+        max_batch_size: int = 25,
+        window: float = 0.05,
+        mode: Literal["alias", "array"] = "alias",
+    ) -> None:
+        """
+        Initialize the QueryBatcher class.
+        :param client: The client to send the batches with
+        :type client: GraphQL
+        :param max_batch_size: Maximum number of queries in a batch, defaults to 25
+        :type max_batch_size: int, optional
+        :param window: Seconds to wait for more queries after the first one
+            of a batch arrives, defaults to 0.05
+        :type window: float, optional
+        :param mode: How to combine the queries, defaults to "alias"
+        :type mode: Literal["alias", "array"], optional
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.mode = mode
+        self._queue: queue.Queue[_Job | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self, query: str, variables: dict[str, Any] = {}
+    ) -> "Future[dict[str, Any]]":
+        """
+        Queue a query for the next batch.
+        :param query: The query to be sent.
+        :type query: str
+        :param variables: The variables to be sent with the query.
+        :type variables: dict[str, Any], optional
+        :return: A future resolving to the response to this query.
+        :rtype: Future[dict[str, Any]]
+        """
+        future: Future[dict[str, Any]] = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._queue.put((query, variables, future))
+        return future
+
+    def query(self, query: str, variables: dict[str, Any] = {}) -> dict[str, Any]:
+        """
+        Queue a query and wait for its response.
+        :param query: The query to be sent.
+        :type query: str
+        :param variables: The variables to be sent with the query.
+        :type variables: dict[str, Any], optional
+        :return: The response to this query.
+        :rtype: dict[str, Any]
+        """
+        return self.submit(query, variables).result()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _send_batch(
+        self, jobs: list[tuple[str, dict[str, Any]]]
+    ) -> list[Any] | None:
+        """
+        Send queries as a single request.
+        :param jobs: The queries and their variables
+        :type jobs: list[tuple[str, dict[str, Any]]]
+        :return: The response to each query, or None if the server refused
+            the batch, eg. for its size or complexity
+        :rtype: list[Any] | None
+        """
+        try:
+            if self.mode == "array":
+                payloads = [self.client._payload(*job) for job in jobs]
+                response = self.client._post(payloads)
+                response.raise_for_status()
+                results = response.json()
+                if not isinstance(results, list) or len(results) != len(jobs):
+                    return None
+                return results
+            try:
+                merged = merge_queries(jobs)
+            except ValueError:
+                return None
+            return merged.split(self.client.query(merged.query, merged.variables))
+        except req.HTTPError as err:
+            status = err.response.status_code if err.response is not None else 0
+            # Rate limits are already retried by the client, sending the
+            # queries separately would only make them worse
+            if 400 <= status < 500 and status != 429:
+                return None
+            raise
+
+    def _dispatch(self, batch: list[_Job]) -> None:
+        jobs = [(query, variables) for query, variables, _ in batch]
+        futures = [future for _, _, future in batch]
+        results = None
+        if len(jobs) > 1:
+            try:
+                results = self._send_batch(jobs)
+            except Exception as err:
+                for future in futures:
+                    future.set_exception(err)
+                return
+        if results is None:
+            # Single query, or the batch was refused: send them one by one
+            for job, future in zip(jobs, futures):
+                try:
+                    future.set_result(self.client.query(*job))
+                except Exception as err:
+                    future.set_exception(err)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def close(self) -> None:
+        """Send the queries still queued, then stop the batching thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def __enter__(self) -> "QueryBatcher":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
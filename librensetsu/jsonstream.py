@@ -0,0 +1,208 @@
+"""Incremental parsing of large JSON files"""
+
+import re
+from json import JSONDecodeError, JSONDecoder
+from typing import IO, Any, Iterator
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_PLAIN = re.compile(r'[^"\[\]{}]+')
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+
+class _Reader:
+    """Buffered reader decoding one JSON value at a time from a text file"""
+
+    def __init__(self, file: IO[str], buffer_size: int) -> None:
+        """
+        Initialize the _Reader class.
+
+        :param file: The file to read from.
+        :type file: IO[str]
+        :param buffer_size: Number of characters read at once.
+        :type buffer_size: int
+        """
+        self.file = file
+        self.buffer_size = buffer_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Drop the consumed part of the buffer and read more of the file.
+
+        :return: Whether more data was read.
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos :]
+        self.pos = 0
+        # Grow geometrically so values spanning many reads are decoded in
+        # a bounded number of retries
+        data = self.file.read(max(self.buffer_size, len(self.buf)))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character.
+
+        :return: The next character, empty at the end of the file.
+        :rtype: str
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """
+        Consume the next character, which must be one of the given ones.
+
+        :param chars: The accepted characters.
+        :type chars: str
+        :return: The consumed character.
+        :rtype: str
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON data, got {char or 'end of data'!r}"
+            )
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Decode the next value.
+
+        :return: The decoded value.
+        :rtype: Any
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut by the end of the buffer continues in the next read
+            if (
+                end < len(self.buf) and self.buf[end] not in _NUMBER_TAIL
+            ) or not self._fill():
+                self.pos = end
+                return value
+
+    def skip(self) -> None:
+        """Consume the next value without building it."""
+        if self.peek() not in ("[", "{"):
+            self.value()
+            return
+        depth = 0
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+            char = self.buf[self.pos]
+            if char == '"':
+                match = _STRING.match(self.buf, self.pos)
+                if match is None:
+                    if not self._fill():
+                        raise ValueError("Unterminated string in JSON data")
+                    continue
+                self.pos = match.end()
+                continue
+            if char in "[{":
+                depth += 1
+            elif char in "]}":
+                depth -= 1
+                if depth == 0:
+                    self.pos += 1
+                    return
+            else:
+                self.pos = _PLAIN.match(self.buf, self.pos).end()  # type: ignore
+                continue
+            self.pos += 1
+
+    def items(self, prefix: list[str]) -> Iterator[Any]:
+        """
+        Yield the values found under a path.
+
+        :param prefix: The remaining path segments, "item" for array elements.
+        :type prefix: list[str]
+        :return: The matching values.
+        :rtype: Iterator[Any]
+        """
+        if not prefix:
+            yield self.value()
+            return
+        head, rest = prefix[0], prefix[1:]
+        # "item" stands for array elements, but may also be a key
+        opener = self.peek()
+        if opener != "{" and (opener != "[" or head != "item"):
+            self.skip()
+            return
+        self.pos += 1
+        closer = "]" if opener == "[" else "}"
+        if self.peek() == closer:
+            self.pos += 1
+            return
+        while True:
+            if opener == "[":
+                yield from self.items(rest)
+            else:
+                if self.peek() != '"':
+                    raise ValueError("Expected an object key in JSON data")
+                key = self.value()
+                self.expect(":")
+                if key == head:
+                    yield from self.items(rest)
+                else:
+                    self.skip()
+            if self.expect("," + closer) == closer:
+                return
+
+
+def iter_json_file(
+    filename: str, path: str = "item", buffer_size: int = 1024 * 1024
+) -> Iterator[Any]:
+    """
+    Parse a JSON file incrementally, yielding the values under a path.
+
+    The path uses the ijson prefix syntax: object keys separated by dots, with
+    "item" standing for each element of an array, eg. "data.item" yields the
+    elements of the array under the "data" key. An empty path yields the whole
+    document. ijson is used when installed, otherwise a pure Python parser
+    that only keeps the current value in memory.
+    :param filename: The JSON file to parse.
+    :type filename: str
+    :param path: The path of the values to yield, defaults to "item"
+    :type path: str, optional
+    :param buffer_size: Number of bytes or characters read at once, defaults
+        to 1 MiB
+    :type buffer_size: int, optional
+    :return: The values under the path, in document order.
+    :rtype: Iterator[Any]
+    """
+    if ijson is not None:
+        with open(filename, "rb") as file:
+            yield from ijson.items(file, path, use_float=True, buf_size=buffer_size)
+        return
+    with open(filename, "r", encoding="utf-8") as file:
+        reader = _Reader(file, buffer_size)
+        yield from reader.items(path.split(".") if path else [])
+        if reader.peek():
+            raise ValueError("Extra data after the JSON document")
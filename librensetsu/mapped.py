@@ -0,0 +1,162 @@
+"""Zero-copy, memory-mapped access to files on disk"""
+
+import mmap
+import re
+from types import TracebackType
+from typing import Iterator
+
+
+class MappedFile:
+    """
+    Read-only memory map of a file.
+
+    The data stays in the page cache instead of being copied to the Python
+    heap; slices return bytes, while `view` gives a zero-copy memoryview.
+    Release every memoryview taken from the file before closing it.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the MappedFile class.
+
+        :param path: The file to map.
+        :type path: str
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            # Empty files can't be mapped
+            self._map: mmap.mmap | bytes = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if file.seek(0, 2)
+                else b""
+            )
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy view of the whole file"""
+        return memoryview(self._map)
+
+    def find(self, sub: bytes, start: int = 0, end: int | None = None) -> int:
+        """
+        Find the first occurrence of a byte string.
+
+        :param sub: The byte string to look for.
+        :type sub: bytes
+        :param start: Offset to start looking at, defaults to 0
+        :type start: int, optional
+        :param end: Offset to stop looking at, defaults to the end of the file
+        :type end: int | None, optional
+        :return: The offset of the occurrence, or -1 if not found.
+        :rtype: int
+        """
+        return self._map.find(sub, start, len(self) if end is None else end)
+
+    def finditer(
+        self, pattern: bytes | re.Pattern[bytes]
+    ) -> Iterator[re.Match[bytes]]:
+        """
+        Search the file with a bytes regular expression.
+
+        :param pattern: The pattern to search for.
+        :type pattern: bytes | re.Pattern[bytes]
+        :return: The matches, in order.
+        :rtype: Iterator[re.Match[bytes]]
+        """
+        return re.finditer(pattern, self._map)
+
+    def text(self, encoding: str = "utf-8", errors: str = "strict") -> "MappedText":
+        """
+        Get a lazy text view of the file.
+
+        :param encoding: The encoding of the file, defaults to "utf-8"
+        :type encoding: str, optional
+        :param errors: How to handle decoding errors, defaults to "strict"
+        :type errors: str, optional
+        :return: The text view.
+        :rtype: MappedText
+        """
+        return MappedText(self, encoding, errors)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __getitem__(self, key: int | slice) -> int | bytes:
+        return self._map[key]
+
+    def __bytes__(self) -> bytes:
+        return self._map[:]
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"MappedFile({self.path!r})"
+
+
+class MappedText:
+    """Text view of a MappedFile, decoding only the parts that are read"""
+
+    def __init__(self, mapped: MappedFile, encoding: str, errors: str) -> None:
+        """
+        Initialize the MappedText class.
+
+        :param mapped: The mapped file.
+        :type mapped: MappedFile
+        :param encoding: The encoding of the file.
+        :type encoding: str
+        :param errors: How to handle decoding errors.
+        :type errors: str
+        """
+        self.mapped = mapped
+        self.encoding = encoding
+        self.errors = errors
+
+    def decode(self, start: int = 0, end: int | None = None) -> str:
+        """
+        Decode a byte range of the file.
+
+        :param start: Offset of the first byte, defaults to 0
+        :type start: int, optional
+        :param end: Offset after the last byte, defaults to the end of the file
+        :type end: int | None, optional
+        :return: The decoded text.
+        :rtype: str
+        """
+        with self.mapped.view as whole, whole[start:end] as view:
+            return str(view, self.encoding, self.errors)
+
+    def lines(self, keepends: bool = False) -> Iterator[str]:
+        """
+        Decode the file one line at a time.
+
+        :param keepends: Whether to keep the line breaks, defaults to False
+        :type keepends: bool, optional
+        :return: The lines of the file.
+        :rtype: Iterator[str]
+        """
+        start, size = 0, len(self.mapped)
+        while start < size:
+            end = self.mapped.find(b"\n", start)
+            end = size if end == -1 else end + 1
+            line = self.decode(start, end)
+            yield line if keepends else line.rstrip("\r\n")
+            start = end
+
+    def __str__(self) -> str:
+        return self.decode()
+
+    def __repr__(self) -> str:
+        return f"MappedText({self.mapped!r}, encoding={self.encoding!r})"
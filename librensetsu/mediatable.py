@@ -0,0 +1,507 @@
+"""Columnar storage of MediaInfo records for bulk analytics"""
+
+from array import array
+from collections import Counter
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, get_type_hints
+
+from .models import MediaInfo, RelationMaps
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+_INT_FIELDS = (
+    "year",
+    "unit_order",
+    "unit_counts",
+    "subunit_order",
+    "subunit_counts",
+    "volume_order",
+    "volume_counts",
+)
+"""MediaInfo fields stored as 64-bit integer arrays"""
+_BOOL_FIELDS = ("is_adult",)
+"""MediaInfo fields stored as 8-bit integer arrays"""
+_CATEGORY_FIELDS = (
+    "media_type",
+    "media_sub_type",
+    "season",
+    "country_of_origin",
+    "source_data",
+)
+"""MediaInfo fields with few distinct values, stored as codes"""
+_OBJECT_FIELDS = (
+    "uuid",
+    "title_display",
+    "title_native",
+    "title_transliteration",
+    "title_english",
+    "synonyms",
+    "start_date",
+    "end_date",
+    "picture_urls",
+    "languages",
+)
+"""MediaInfo fields stored as lists of Python objects"""
+
+_MAPPING_HINTS = get_type_hints(RelationMaps)
+_INT_SERVICES = tuple(
+    name for name, hint in _MAPPING_HINTS.items() if hint == Optional[int]
+)
+"""RelationMaps fields holding plain integer IDs"""
+_OBJECT_SERVICES = tuple(name for name in _MAPPING_HINTS if name not in _INT_SERVICES)
+"""RelationMaps fields holding slugs, ID/slug pairs or other objects"""
+
+
+class _IntColumn:
+    """Integers in a typed array, with a validity mask for missing values"""
+
+    __slots__ = ("values", "valid")
+
+    def __init__(self, typecode: str = "q") -> None:
+        self.values = array(typecode)
+        self.valid = bytearray()
+
+    def append(self, value: Any) -> None:
+        self.values.append(0 if value is None else int(value))
+        self.valid.append(value is not None)
+
+    def get(self, index: int) -> Any:
+        return self.values[index] if self.valid[index] else None
+
+    def take(self, indices: Sequence[int]) -> "_IntColumn":
+        column = _IntColumn(self.values.typecode)
+        values, valid = self.values, self.valid
+        column.values = array(self.values.typecode, [values[i] for i in indices])
+        column.valid = bytearray(valid[i] for i in indices)
+        return column
+
+    def equals(self, value: Any) -> Sequence[bool]:
+        if value is None:
+            return [not valid for valid in self.valid]
+        if np is not None:
+            mask = np.frombuffer(self.values, dtype=self.values.typecode) == value
+            return mask & np.frombuffer(self.valid, dtype=np.bool_)
+        return [
+            valid and stored == value for stored, valid in zip(self.values, self.valid)
+        ]
+
+    def counts(self) -> Counter:
+        counts: Counter = Counter(
+            stored for stored, valid in zip(self.values, self.valid) if valid
+        )
+        missing = len(self.valid) - sum(self.valid)
+        if missing:
+            counts[None] = missing
+        return counts
+
+
+class _CategoryColumn:
+    """Strings from a small set of values, stored as codes into that set"""
+
+    __slots__ = ("codes", "categories", "lookup")
+
+    def __init__(self) -> None:
+        self.codes = array("i")
+        self.categories: list[Any] = [None]
+        self.lookup: dict[Any, int] = {None: 0}
+
+    def append(self, value: Any) -> None:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def get(self, index: int) -> Any:
+        return self.categories[self.codes[index]]
+
+    def take(self, indices: Sequence[int]) -> "_CategoryColumn":
+        column = _CategoryColumn()
+        column.categories = list(self.categories)
+        column.lookup = dict(self.lookup)
+        codes = self.codes
+        column.codes = array("i", [codes[i] for i in indices])
+        return column
+
+    def equals(self, value: Any) -> Sequence[bool]:
+        code = self.lookup.get(value)
+        if code is None:
+            return [False] * len(self.codes)
+        if np is not None:
+            return np.frombuffer(self.codes, dtype=np.int32) == code
+        return [stored == code for stored in self.codes]
+
+    def counts(self) -> Counter:
+        if np is not None:
+            codes, counts = np.unique(
+                np.frombuffer(self.codes, dtype=np.int32), return_counts=True
+            )
+            pairs = zip(codes.tolist(), counts.tolist())
+        else:
+            pairs = Counter(self.codes).items()
+        return Counter({self.categories[code]: count for code, count in pairs})
+
+
+class _ObjectColumn:
+    """Arbitrary Python objects"""
+
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+
+    def append(self, value: Any) -> None:
+        self.values.append(value)
+
+    def get(self, index: int) -> Any:
+        return self.values[index]
+
+    def take(self, indices: Sequence[int]) -> "_ObjectColumn":
+        column = _ObjectColumn()
+        values = self.values
+        column.values = [values[i] for i in indices]
+        return column
+
+    def equals(self, value: Any) -> Sequence[bool]:
+        return [stored == value for stored in self.values]
+
+    def counts(self) -> Counter:
+        return Counter(self.values)
+
+
+_Column = _IntColumn | _CategoryColumn | _ObjectColumn
+
+
+class MediaInfoRow:
+    """
+    View of a row of a MediaInfoTable, reading its fields from the columns.
+
+    Mapping IDs are read with their RelationMaps field name prefixed by
+    "mappings.", eg. `row["mappings.anilist"]`, or as a RelationMaps through
+    the `mappings` attribute.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MediaInfoTable", index: int) -> None:
+        """
+        Initialize the MediaInfoRow class.
+        :param table: The table the row belongs to
+        :type table: MediaInfoTable
+        :param index: Position of the row in the table
+        :type index: int
+        """
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "mappings":
+            return self._table._mappings(self._index)
+        if name not in self._table._columns:
+            raise AttributeError(f"'MediaInfoRow' object has no attribute '{name}'")
+        return self._table._value(name, self._index)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._table._columns:
+            raise KeyError(name)
+        return self._table._value(name, self._index)
+
+    def to_media_info(self) -> MediaInfo:
+        """
+        Convert the row back to a MediaInfo object.
+        :return: MediaInfo object
+        :rtype: MediaInfo
+        """
+        return self._table._record(self._index)
+
+    def __repr__(self) -> str:
+        return f"MediaInfoRow({self._index}, uuid={self.uuid!r})"
+
+
+class MediaInfoTable:
+    """
+    MediaInfo records stored column by column.
+
+    Integer fields and integer mapping IDs live in typed arrays with a
+    validity mask, low-cardinality strings (media type, season, country,
+    source) as codes into a list of values, and the rest as lists. Filters
+    and group-bys scan a single column instead of every object, and use
+    NumPy when installed.
+    """
+
+    def __init__(self, records: Iterable[MediaInfo] = ()) -> None:
+        """
+        Initialize the MediaInfoTable class.
+        :param records: The records to store, defaults to none
+        :type records: Iterable[MediaInfo], optional
+        """
+        self._columns: dict[str, _Column] = {}
+        for name in _INT_FIELDS:
+            self._columns[name] = _IntColumn()
+        for name in _BOOL_FIELDS:
+            self._columns[name] = _IntColumn("b")
+        for name in _CATEGORY_FIELDS:
+            self._columns[name] = _CategoryColumn()
+        for name in _OBJECT_FIELDS:
+            self._columns[name] = _ObjectColumn()
+        for name in _INT_SERVICES:
+            self._columns[f"mappings.{name}"] = _IntColumn()
+        for name in _OBJECT_SERVICES:
+            self._columns[f"mappings.{name}"] = _ObjectColumn()
+        self._length = 0
+        self.extend(records)
+
+    def append(self, record: MediaInfo) -> None:
+        """
+        Add a record at the end of the table.
+        :param record: The record to add
+        :type record: MediaInfo
+        """
+        columns = self._columns
+        for name in (*_INT_FIELDS, *_BOOL_FIELDS, *_CATEGORY_FIELDS, *_OBJECT_FIELDS):
+            columns[name].append(getattr(record, name))
+        maps = record.mappings
+        for name in _MAPPING_HINTS:
+            columns[f"mappings.{name}"].append(getattr(maps, name))
+        self._length += 1
+
+    def extend(self, records: Iterable[MediaInfo]) -> None:
+        """
+        Add records at the end of the table.
+        :param records: The records to add
+        :type records: Iterable[MediaInfo]
+        """
+        for record in records:
+            self.append(record)
+
+    @property
+    def column_names(self) -> list[str]:
+        """Names of the columns, mapping IDs prefixed by "mappings." """
+        return list(self._columns)
+
+    def column(self, name: str) -> array | list[Any]:
+        """
+        Get the raw storage of a column, without copying it.
+
+        Integer columns are arrays holding 0 for missing values, see `valid`;
+        category columns are arrays of codes into `categories`.
+        :param name: The column name
+        :type name: str
+        :return: The column values
+        :rtype: array | list[Any]
+        """
+        column = self._columns[name]
+        if isinstance(column, _CategoryColumn):
+            return column.codes
+        return column.values
+
+    def valid(self, name: str) -> bytearray:
+        """
+        Get the validity mask of an integer column, 1 where a value is set.
+        :param name: The column name
+        :type name: str
+        :return: The validity mask
+        :rtype: bytearray
+        """
+        column = self._columns[name]
+        if not isinstance(column, _IntColumn):
+            raise TypeError(f"Column {name} is not an integer column")
+        return column.valid
+
+    def categories(self, name: str) -> list[Any]:
+        """
+        Get the values the codes of a category column refer to.
+        :param name: The column name
+        :type name: str
+        :return: The values, by code
+        :rtype: list[Any]
+        """
+        column = self._columns[name]
+        if not isinstance(column, _CategoryColumn):
+            raise TypeError(f"Column {name} is not a category column")
+        return column.categories
+
+    def to_numpy(self, name: str) -> Any:
+        """
+        Get an integer column as a NumPy masked array sharing its memory.
+        :param name: The column name
+        :type name: str
+        :return: The masked array
+        :rtype: numpy.ma.MaskedArray
+        """
+        if np is None:
+            raise ImportError("numpy is required to convert columns to arrays")
+        column = self._columns[name]
+        if not isinstance(column, _IntColumn):
+            raise TypeError(f"Column {name} is not an integer column")
+        values = np.frombuffer(column.values, dtype=column.values.typecode)
+        return np.ma.masked_array(values, ~np.frombuffer(column.valid, dtype=np.bool_))
+
+    def mask(self, **conditions: Any) -> list[bool]:
+        """
+        Find the rows whose columns equal the given values.
+
+        Mapping columns can be given as `mappings__<service>`, since dots are
+        not allowed in keyword names.
+        :param conditions: The values to match, by column name
+        :type conditions: Any
+        :return: Whether each row matches every condition
+        :rtype: list[bool]
+        """
+        return [bool(keep) for keep in self._match(conditions)]
+
+    def _match(self, conditions: dict[str, Any]) -> Sequence[bool]:
+        result: Any = [True] * self._length
+        if np is not None:
+            result = np.ones(self._length, dtype=np.bool_)
+        for name, value in conditions.items():
+            matches = self._columns[name.replace("__", ".", 1)].equals(value)
+            if np is not None:
+                result &= np.asarray(matches, dtype=np.bool_)
+            else:
+                result = [a and b for a, b in zip(result, matches)]
+        return result
+
+    def where(self, mask: Sequence[bool]) -> "MediaInfoTable":
+        """
+        Keep the rows where the mask is true.
+        :param mask: One boolean per row
+        :type mask: Sequence[bool]
+        :return: A new table with the selected rows
+        :rtype: MediaInfoTable
+        """
+        return self.take([index for index, keep in enumerate(mask) if keep])
+
+    def filter(
+        self, predicate: Callable[[MediaInfoRow], bool] | None = None, **conditions: Any
+    ) -> "MediaInfoTable":
+        """
+        Keep the rows matching the conditions, see `mask`, and the predicate.
+        :param predicate: Function called on the rows matching the conditions,
+            defaults to None
+        :type predicate: Callable[[MediaInfoRow], bool] | None, optional
+        :param conditions: The values to match, by column name
+        :type conditions: Any
+        :return: A new table with the selected rows
+        :rtype: MediaInfoTable
+        """
+        matches = self._match(conditions)
+        if np is not None:
+            indices = np.flatnonzero(matches).tolist()
+        else:
+            indices = [index for index, keep in enumerate(matches) if keep]
+        if predicate is not None:
+            indices = [i for i in indices if predicate(MediaInfoRow(self, i))]
+        return self.take(indices)
+
+    def take(self, indices: Sequence[int]) -> "MediaInfoTable":
+        """
+        Select rows by position.
+        :param indices: Positions of the rows, in the order to keep them
+        :type indices: Sequence[int]
+        :return: A new table with the selected rows
+        :rtype: MediaInfoTable
+        """
+        table = MediaInfoTable.__new__(MediaInfoTable)
+        table._columns = {
+            name: column.take(indices) for name, column in self._columns.items()
+        }
+        table._length = len(indices)
+        return table
+
+    def value_counts(self, name: str) -> Counter:
+        """
+        Count the rows by the value of a column, missing values under None.
+        :param name: The column name
+        :type name: str
+        :return: The number of rows by value
+        :rtype: Counter
+        """
+        return self._columns[name].counts()
+
+    def group_by(self, *names: str) -> dict[tuple[Any, ...], list[int]]:
+        """
+        Group the rows by the values of one or more columns.
+        :param names: The column names
+        :type names: str
+        :return: The positions of the rows, by their values
+        :rtype: dict[tuple[Any, ...], list[int]]
+        """
+        columns = [self._columns[name] for name in names]
+        groups: dict[tuple[Any, ...], list[int]] = {}
+        for index in range(self._length):
+            key = tuple(column.get(index) for column in columns)
+            groups.setdefault(key, []).append(index)
+        return groups
+
+    def group_count(self, *names: str) -> Counter:
+        """
+        Count the rows by the values of one or more columns.
+        :param names: The column names
+        :type names: str
+        :return: The number of rows by their values
+        :rtype: Counter
+        """
+        if len(names) == 1:
+            return Counter({(k,): v for k, v in self.value_counts(names[0]).items()})
+        return Counter({key: len(rows) for key, rows in self.group_by(*names).items()})
+
+    def coverage(self) -> dict[str, int]:
+        """
+        Count the rows mapped to each service.
+        :return: Number of rows with an ID, by RelationMaps field
+        :rtype: dict[str, int]
+        """
+        result: dict[str, int] = {}
+        for name in _MAPPING_HINTS:
+            column = self._columns[f"mappings.{name}"]
+            if isinstance(column, _IntColumn):
+                result[name] = sum(column.valid)
+            else:
+                result[name] = self._length - column.values.count(None)
+        return result
+
+    def _value(self, name: str, index: int) -> Any:
+        value = self._columns[name].get(index)
+        if value is not None and name in _BOOL_FIELDS:
+            return bool(value)
+        return value
+
+    def _mappings(self, index: int) -> RelationMaps:
+        columns = self._columns
+        return RelationMaps(
+            **{name: columns[f"mappings.{name}"].get(index) for name in _MAPPING_HINTS}
+        )
+
+    def _record(self, index: int) -> MediaInfo:
+        values = {
+            name: self._value(name, index)
+            for name in (*_INT_FIELDS, *_BOOL_FIELDS, *_CATEGORY_FIELDS, *_OBJECT_FIELDS)
+        }
+        return MediaInfo(mappings=self._mappings(index), **values)
+
+    def to_records(self) -> list[MediaInfo]:
+        """
+        Convert every row back to a MediaInfo object.
+        :return: The records
+        :rtype: list[MediaInfo]
+        """
+        return [self._record(index) for index in range(self._length)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> MediaInfoRow:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MediaInfoTable index out of range")
+        return MediaInfoRow(self, index)
+
+    def __iter__(self) -> Iterator[MediaInfoRow]:
+        return (MediaInfoRow(self, index) for index in range(self._length))
+
+    def __repr__(self) -> str:
+        return f"MediaInfoTable({self._length} rows)"
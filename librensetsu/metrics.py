@@ -0,0 +1,151 @@
+"""Download metrics and the sinks they can be reported to"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class DownloadMetrics:
+    """Measurements of a single download"""
+
+    url: str
+    """The URL downloaded from"""
+    started_at: float
+    """Unix time the download started at"""
+    bytes: int = 0
+    """Number of bytes received, before decompression"""
+    ttfb: float | None = None
+    """Seconds between sending the request and receiving the first byte"""
+    duration: float = 0.0
+    """Seconds spent on the download, retries included"""
+    retries: int = 0
+    """Number of failed attempts that were retried"""
+    cache_hit: bool = False
+    """Whether the server reported the local file as up to date"""
+    resumed_from: int = 0
+    """Size of the partial file the download resumed from, in bytes"""
+    segments: int = 1
+    """Number of byte ranges downloaded concurrently"""
+    status: int | None = None
+    """HTTP status of the last response"""
+    error: str | None = None
+    """Description of the error that made the download fail, if any"""
+
+    @property
+    def throughput(self) -> float:
+        """Bytes received per second"""
+        return self.bytes / self.duration if self.duration > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the metrics to a dictionary, throughput included.
+
+        :return: The metrics.
+        :rtype: dict[str, Any]
+        """
+        return {**asdict(self), "throughput": self.throughput}
+
+
+MetricsSink = Callable[[DownloadMetrics], Any]
+"""Function receiving the metrics of every finished download"""
+
+
+class JsonLinesSink:
+    """Append the metrics of every download to a JSON lines file"""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the JsonLinesSink class.
+
+        :param path: The file to append to.
+        :type path: str
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: DownloadMetrics) -> None:
+        line = json.dumps(metrics.to_dict())
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    def __repr__(self) -> str:
+        return f"JsonLinesSink({self.path!r})"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusSink:
+    """
+    Keep per-URL totals of the downloads in a Prometheus text exposition file,
+    eg. for the node_exporter textfile collector.
+    """
+
+    _COUNTERS = {
+        "downloads_total": "Number of downloads",
+        "failures_total": "Number of failed downloads",
+        "cache_hits_total": "Number of downloads skipped as not modified",
+        "retries_total": "Number of retried attempts",
+        "bytes_total": "Number of bytes received",
+        "duration_seconds_total": "Seconds spent downloading",
+    }
+    _GAUGES = {
+        "ttfb_seconds": "Time to first byte of the last download",
+        "throughput_bytes_per_second": "Throughput of the last download",
+    }
+
+    def __init__(self, path: str, prefix: str = "librensetsu_download_") -> None:
+        """
+        Initialize the PrometheusSink class.
+
+        :param path: The file to write the metrics to, replaced atomically.
+        :type path: str
+        :param prefix: Prefix of the metric names, defaults to
+            "librensetsu_download_"
+        :type prefix: str, optional
+        """
+        self.path = path
+        self.prefix = prefix
+        self._values: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: DownloadMetrics) -> None:
+        with self._lock:
+            values = self._values.setdefault(
+                metrics.url, dict.fromkeys(self._COUNTERS, 0.0)
+            )
+            values["downloads_total"] += 1
+            values["failures_total"] += metrics.error is not None
+            values["cache_hits_total"] += metrics.cache_hit
+            values["retries_total"] += metrics.retries
+            values["bytes_total"] += metrics.bytes
+            values["duration_seconds_total"] += metrics.duration
+            if metrics.ttfb is not None:
+                values["ttfb_seconds"] = metrics.ttfb
+            if metrics.bytes:
+                values["throughput_bytes_per_second"] = metrics.throughput
+            self._write()
+
+    def _write(self) -> None:
+        lines: list[str] = []
+        for kind, names in (("counter", self._COUNTERS), ("gauge", self._GAUGES)):
+            for name, description in names.items():
+                lines.append(f"# HELP {self.prefix}{name} {description}")
+                lines.append(f"# TYPE {self.prefix}{name} {kind}")
+                for url, values in self._values.items():
+                    if name in values:
+                        label = _escape_label(url)
+                        value = values[name]
+                        text = str(int(value)) if value.is_integer() else repr(value)
+                        lines.append(f'{self.prefix}{name}{{url="{label}"}} {text}')
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+    def __repr__(self) -> str:
+        return f"PrometheusSink({self.path!r})"
@@ -1,6 +1,22 @@
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, fields, is_dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, Optional, Union
+from types import UnionType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 Iso31661A2 = Literal[
     "AD", "AE", "AF", "AG", "AI", "AL", "AM", "AO", "AQ", "AR",
@@ -54,7 +70,7 @@ Iso639S2 = Literal[
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class Date:
     """Information regarding release dates"""
 
@@ -113,7 +129,7 @@ class Date:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PictureUrls:
     """Information regarding picture URLs"""
 
@@ -129,7 +145,7 @@ class PictureUrls:
     """A tiny picture URL"""
 
 
-@dataclass
+@dataclass(slots=True)
 class IdSlugPair:
     """Information regarding ID and slug pairs"""
 
@@ -139,7 +155,7 @@ class IdSlugPair:
     """The slug of the media"""
 
 
-@dataclass
+@dataclass(slots=True)
 class ConventionalMapping(IdSlugPair):
     """Mapping information for conventional media databases"""
 
@@ -149,14 +165,14 @@ class ConventionalMapping(IdSlugPair):
     """The season of the media, if applicable"""
 
 
-@dataclass
+@dataclass(slots=True)
 class TraktSeason(IdSlugPair):
     """Mapping info on Trakt if the ID is a season only"""
 
     media_type: Optional[Literal["seasons"]] = None
     """The type of ID"""
 
-@dataclass
+@dataclass(slots=True)
 class RelationMaps:
     """Information regarding direct relation maps"""
 
@@ -250,7 +266,253 @@ class RelationMaps:
     """Other IDs"""
 
 
-@dataclass
+_RELATION_FIELDS: Tuple[str, ...] = tuple(field.name for field in fields(RelationMaps))
+_RELATION_INDEX: Dict[str, int] = {name: i for i, name in enumerate(_RELATION_FIELDS)}
+
+
+class SparseRelationMaps:
+    """
+    Read-only, compact counterpart of RelationMaps storing only the IDs that
+    are set.
+
+    Most media are only mapped to a handful of the services, so instead of a
+    slot per service, a bit mask records which IDs are present and a tuple
+    holds their values. Missing IDs read as None, like on RelationMaps.
+    """
+
+    __slots__ = ("_mask", "_values")
+
+    def __init__(self, **ids: Any) -> None:
+        """
+        Initialize the SparseRelationMaps class.
+
+        :param ids: The IDs, by the name of their RelationMaps field
+        :type ids: Any
+        """
+        mask = 0
+        for name, value in ids.items():
+            if name not in _RELATION_INDEX:
+                raise TypeError(f"Unknown relation map field: {name}")
+            if value is not None:
+                mask |= 1 << _RELATION_INDEX[name]
+        self._mask = mask
+        self._values = tuple(
+            ids[name] for i, name in enumerate(_RELATION_FIELDS) if mask >> i & 1
+        )
+
+    @classmethod
+    def from_maps(cls, maps: RelationMaps) -> "SparseRelationMaps":
+        """
+        Create a SparseRelationMaps object from a RelationMaps object.
+        :param maps: The relation maps to compact
+        :type maps: RelationMaps
+        :return: SparseRelationMaps object
+        :rtype: SparseRelationMaps
+        """
+        return cls(**{name: getattr(maps, name) for name in _RELATION_FIELDS})
+
+    def to_maps(self) -> RelationMaps:
+        """
+        Convert back to a RelationMaps object.
+        :return: RelationMaps object
+        :rtype: RelationMaps
+        """
+        return RelationMaps(**dict(self.items()))
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over the IDs that are set.
+        :return: The field names and their values, in field order
+        :rtype: Iterator[Tuple[str, Any]]
+        """
+        values = iter(self._values)
+        for i, name in enumerate(_RELATION_FIELDS):
+            if self._mask >> i & 1:
+                yield name, next(values)
+
+    def __getattr__(self, name: str) -> Any:
+        index = _RELATION_INDEX.get(name)
+        if index is None:
+            raise AttributeError(
+                f"'SparseRelationMaps' object has no attribute '{name}'"
+            )
+        if not self._mask >> index & 1:
+            return None
+        return self._values[(self._mask & ((1 << index) - 1)).bit_count()]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RelationMaps):
+            other = SparseRelationMaps.from_maps(other)
+        if not isinstance(other, SparseRelationMaps):
+            return NotImplemented
+        return self._mask == other._mask and self._values == other._values
+
+    def __repr__(self) -> str:
+        ids = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"SparseRelationMaps({ids})"
+
+
+Converter = Callable[[Any], Any]
+"""Function converting a value loaded from JSON to the type of a field"""
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+_CONVERTERS: Dict[Tuple[type, bool], Converter] = {}
+
+
+def _literal_values(hint: Any) -> Optional[FrozenSet[Any]]:
+    """
+    Collect the values allowed by a Literal, or an Optional Literal.
+    :param hint: The type hint
+    :type hint: Any
+    :return: The allowed values, None if the hint is not a Literal
+    :rtype: FrozenSet[Any] | None
+    """
+    if get_origin(hint) is Literal:
+        return frozenset(get_args(hint))
+    if get_origin(hint) in (Union, UnionType):
+        args = [arg for arg in get_args(hint) if arg is not type(None)]
+        if len(args) == 1 and get_origin(args[0]) is Literal:
+            return frozenset(get_args(args[0])) | {None}
+    return None
+
+
+def _check_literal(allowed: FrozenSet[Any], path: str) -> Converter:
+    def check(value: Any) -> Any:
+        if value not in allowed:
+            raise ValueError(f"{path}: {value!r} is not an allowed value")
+        return value
+
+    return check
+
+
+def _value_converter(hint: Any, strict: bool, path: str) -> Optional[Converter]:
+    """
+    Build the function converting a value loaded from JSON to a type.
+    :param hint: The type to convert to
+    :type hint: Any
+    :param strict: Whether to check the values of Literal types
+    :type strict: bool
+    :param path: Name of the field, for error messages
+    :type path: str
+    :return: The converter, None if the value can be used as is
+    :rtype: Converter | None
+    """
+    allowed = _literal_values(hint)
+    if allowed is not None:
+        return _check_literal(allowed, path) if strict else None
+    if is_dataclass(hint):
+        return _compile_converter(hint, strict)
+    origin, args = get_origin(hint), get_args(hint)
+    if origin in (Union, UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            convert = _value_converter(options[0], strict, path)
+            if convert is None:
+                return None
+            return lambda value: None if value is None else convert(value)
+        classes = [arg for arg in options if is_dataclass(arg)]
+        if not classes:
+            return None
+        # Literal fields tell dataclasses of similar shape apart, so always
+        # check them and only fall back to the first class when lenient
+        candidates = [_compile_converter(cls, True) for cls in classes]
+        fallback = _compile_converter(classes[0], False)
+
+        def convert_union(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            for candidate in candidates:
+                try:
+                    return candidate(value)
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if strict:
+                raise ValueError(f"{path}: {value!r} matches none of {classes}")
+            return fallback(value)
+
+        return convert_union
+    if origin in (list, List):
+        item_allowed = _literal_values(args[0]) if args else None
+        if item_allowed is not None:
+            if not strict:
+                return None
+
+            def check_items(value: Any) -> Any:
+                if value is not None and not item_allowed.issuperset(value):
+                    invalid = sorted(set(value) - item_allowed, key=repr)
+                    raise ValueError(f"{path}: {invalid!r} are not allowed values")
+                return value
+
+            return check_items
+        convert_item = _value_converter(args[0], strict, path) if args else None
+        if convert_item is None:
+            return None
+        return lambda value: [convert_item(item) for item in value]
+    if origin in (dict, Dict):
+        convert_item = _value_converter(args[1], strict, path) if args else None
+        if convert_item is None:
+            return None
+        return lambda value: {key: convert_item(item) for key, item in value.items()}
+    return None
+
+
+def _compile_converter(cls: type, strict: bool = True) -> Converter:
+    """
+    Generate, once per class, the function creating a dataclass from a dict.
+
+    Fields missing from the dict take their default, or None when their type
+    is Optional, else raise ValueError; unknown keys are ignored.
+    :param cls: The dataclass to create
+    :type cls: type
+    :param strict: Whether to check the values of Literal types
+    :type strict: bool, optional
+    :return: Function taking the dict and returning the dataclass
+    :rtype: Converter
+    """
+    converter = _CONVERTERS.get((cls, strict))
+    if converter is not None:
+        return converter
+    hints = get_type_hints(cls)
+
+    def missing(name: str) -> Any:
+        raise ValueError(f"{cls.__name__}.{name}: missing value")
+
+    namespace: Dict[str, Any] = {"cls": cls, "missing": missing}
+    arguments = []
+    for field in fields(cls):
+        name, hint = field.name, hints[field.name]
+        if field.default is not MISSING:
+            namespace[f"default_{name}"] = field.default
+            value = f"get({name!r}, default_{name})"
+        elif field.default_factory is not MISSING:
+            namespace[f"factory_{name}"] = field.default_factory
+            value = f"data[{name!r}] if {name!r} in data else factory_{name}()"
+        elif type(None) in get_args(hint):
+            value = f"get({name!r})"
+        else:
+            value = f"data[{name!r}] if {name!r} in data else missing({name!r})"
+        convert = _value_converter(hint, strict, f"{cls.__name__}.{name}")
+        if convert is not None:
+            namespace[f"convert_{name}"] = convert
+            value = f"convert_{name}({value})"
+        arguments.append(f"        {name}={value},")
+    source = "\n".join(
+        [
+            "def from_dict(data):",
+            "    if isinstance(data, cls):",
+            "        return data",
+            "    get = data.get",
+            "    return cls(",
+            *arguments,
+            "    )",
+        ]
+    )
+    exec(source, namespace)
+    converter = _CONVERTERS[(cls, strict)] = namespace["from_dict"]
+    return converter
+
+
+@dataclass(slots=True)
 class MediaInfo:
     """Information regarding media"""
 
@@ -344,3 +606,38 @@ class MediaInfo:
         "rensetsu",
     ] = "rensetsu"
     """The source of the data"""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], strict: bool = True) -> "MediaInfo":
+        """
+        Create a MediaInfo object from a dict, eg. loaded from JSON.
+
+        The conversion is generated once from the type hints of the models,
+        and only checks the values of Literal types (countries, languages,
+        media types, sources...) unlike dacite, which checks every field.
+        :param data: The media information, with nested dicts for the models
+        :type data: Dict[str, Any]
+        :param strict: Whether to raise ValueError on values not allowed by a
+            Literal type, defaults to True
+        :type strict: bool, optional
+        :return: MediaInfo object
+        :rtype: MediaInfo
+        """
+        return _compile_converter(cls, strict)(data)
+
+    @classmethod
+    def from_dicts(
+        cls, items: Iterable[Dict[str, Any]], strict: bool = True
+    ) -> List["MediaInfo"]:
+        """
+        Create MediaInfo objects from dicts, see `from_dict`.
+        :param items: The media information
+        :type items: Iterable[Dict[str, Any]]
+        :param strict: Whether to raise ValueError on values not allowed by a
+            Literal type, defaults to True
+        :type strict: bool, optional
+        :return: MediaInfo objects
+        :rtype: List[MediaInfo]
+        """
+        convert = _compile_converter(cls, strict)
+        return [convert(data) for data in items]
@@ -0,0 +1,67 @@
+"""Helpers to run text functions over large batches"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, TypeVar
+
+from .cache import ResultCache
+
+T = TypeVar("T")
+
+_MISSING: Any = object()
+
+
+def map_unique(
+    func: Callable[[str], T],
+    texts: Iterable[str],
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    cache: ResultCache[Any, T] | None = None,
+    key: Callable[[str], Hashable] | None = None,
+) -> list[T]:
+    """
+    Apply a function to every text, computing each distinct text only once.
+
+    Batches with more distinct texts than a single chunk are spread across a
+    process pool, smaller ones run in the current process.
+    :param func: The function to apply, must be picklable (module-level
+        function or `functools.partial` of one)
+    :type func: Callable[[str], T]
+    :param texts: The texts to process
+    :type texts: Iterable[str]
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :type workers: int | None, optional
+    :param chunk_size: Number of texts sent to a worker at once, defaults to 1000
+    :type chunk_size: int, optional
+    :param cache: Cache to look results up in before computing them, and to
+        store computed results in, defaults to None
+    :type cache: ResultCache[Any, T] | None, optional
+    :param key: Function building the cache key of a text, defaults to the
+        text itself
+    :type key: Callable[[str], Hashable] | None, optional
+    :return: The results, in the same order as the input
+    :rtype: list[T]
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer")
+    texts = list(texts)
+    lookup: dict[str, T] = {}
+    pending = list(dict.fromkeys(texts))
+    if cache is not None:
+        key = key or (lambda text: text)
+        for text in pending:
+            value = cache.get(key(text), _MISSING)
+            if value is not _MISSING:
+                lookup[text] = value
+        pending = [text for text in pending if text not in lookup]
+    if workers == 1 or len(pending) <= chunk_size:
+        results = [func(text) for text in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, pending, chunksize=chunk_size))
+    for text, value in zip(pending, results):
+        lookup[text] = value
+        if cache is not None and key is not None:
+            cache.put(key(text), value)
+    return [lookup[text] for text in texts]
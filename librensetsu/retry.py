@@ -0,0 +1,145 @@
+"""Retry policy with exponential backoff, shared by the HTTP clients"""
+
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, TypeVar
+
+import requests as req
+
+T = TypeVar("T")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a `Retry-After` header, given either in seconds or as a HTTP date.
+    :param value: The header value.
+    :type value: str | None
+    :return: Number of seconds to wait, or None if absent or invalid.
+    :rtype: float | None
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request"""
+
+    max_attempts: int = 4
+    """Number of attempts, including the first one; 1 disables retries"""
+    backoff: float = 0.5
+    """Delay before the first retry in seconds, doubled on every retry"""
+    max_backoff: float = 60.0
+    """Upper bound of the exponential delay in seconds"""
+    jitter: float = 0.5
+    """Fraction of the delay randomly taken off, so clients don't retry in sync"""
+    statuses: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+    """HTTP status codes worth retrying"""
+    errors: tuple[type[Exception], ...] = (
+        req.ConnectionError,
+        req.Timeout,
+        req.exceptions.ChunkedEncodingError,
+    )
+    """Exceptions worth retrying, besides HTTP errors with a retryable status"""
+    respect_retry_after: bool = True
+    """Whether to wait as long as the Retry-After header asks, if longer"""
+    max_retry_after: float = 300.0
+    """Longest Retry-After in seconds honoured before giving up instead"""
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be a positive integer")
+
+    def should_retry(
+        self,
+        attempt: int,
+        response: req.Response | None = None,
+        error: BaseException | None = None,
+    ) -> bool:
+        """
+        Check whether a failed attempt should be retried.
+        :param attempt: Number of the failed attempt, starting at 0
+        :type attempt: int
+        :param response: The response of the attempt, if any
+        :type response: requests.Response | None, optional
+        :param error: The exception raised by the attempt, if any
+        :type error: BaseException | None, optional
+        :return: Whether to try again.
+        :rtype: bool
+        """
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if isinstance(error, req.HTTPError) and response is None:
+            response = error.response
+        if response is not None and response.status_code in self.statuses:
+            retry_after = self._retry_after(response)
+            return retry_after is None or retry_after <= self.max_retry_after
+        return response is None and isinstance(error, self.errors)
+
+    def _retry_after(self, response: req.Response | None) -> float | None:
+        if not self.respect_retry_after or response is None:
+            return None
+        return parse_retry_after(response.headers.get("Retry-After"))
+
+    def delay(self, attempt: int, response: req.Response | None = None) -> float:
+        """
+        Compute how long to wait before the next attempt.
+        :param attempt: Number of the failed attempt, starting at 0
+        :type attempt: int
+        :param response: The response of the attempt, for its Retry-After
+        :type response: requests.Response | None, optional
+        :return: Number of seconds to wait.
+        :rtype: float
+        """
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        delay -= delay * self.jitter * random.random()
+        retry_after = self._retry_after(response)
+        return delay if retry_after is None else max(delay, retry_after)
+
+    def call(
+        self,
+        func: Callable[[], T],
+        on_retry: Callable[[int, float], Any] | None = None,
+    ) -> T:
+        """
+        Call a function until it succeeds or the attempts run out.
+
+        Attempts fail when they raise a retryable exception, or return a
+        response with a retryable status, which is then returned as is once
+        no attempts are left.
+        :param func: The function to call
+        :type func: Callable[[], T]
+        :param on_retry: Function called with the number of the next attempt
+            and the delay before it, defaults to None
+        :type on_retry: Callable[[int, float], Any] | None, optional
+        :return: The result of the last attempt.
+        :rtype: T
+        """
+        attempt = 0
+        while True:
+            try:
+                result = func()
+            except Exception as err:
+                response = err.response if isinstance(err, req.HTTPError) else None
+                if not self.should_retry(attempt, response, err):
+                    raise
+            else:
+                if not isinstance(result, req.Response):
+                    return result
+                response = result
+                if not self.should_retry(attempt, response):
+                    return result
+                response.close()
+            delay = self.delay(attempt, response)
+            attempt += 1
+            if on_retry is not None:
+                on_retry(attempt, delay)
+            time.sleep(delay)
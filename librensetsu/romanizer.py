@@ -0,0 +1,134 @@
+"""Managed Cutlet instances for Japanese romanization"""
+
+import threading
+from typing import Literal
+
+from cutlet import Cutlet
+
+RomajiSystem = Literal["hepburn", "kunrei", "nihon"]
+"""Romanization systems supported by Cutlet"""
+
+
+class Romanizer:
+    """
+    Lazily-initialized Cutlet instances sharing one configuration.
+
+    Creating a Cutlet loads the UniDic tagger and its dictionary, so each
+    thread creates its instance once, on first use, and reuses it afterwards.
+    MeCab taggers are not thread-safe, hence one instance per thread.
+    """
+
+    def __init__(
+        self,
+        system: RomajiSystem = "hepburn",
+        use_foreign_spelling: bool = True,
+        ensure_ascii: bool = True,
+    ) -> None:
+        """
+        Initialize the Romanizer class.
+
+        :param system: The romanization system to use, defaults to "hepburn"
+        :type system: RomajiSystem, optional
+        :param use_foreign_spelling: Whether to use the original spelling of
+            loanwords, eg. "cheese" instead of "chiizu", defaults to True
+        :type use_foreign_spelling: bool, optional
+        :param ensure_ascii: Whether to drop characters that can't be
+            romanized, defaults to True
+        :type ensure_ascii: bool, optional
+        """
+        self.system = system
+        self.use_foreign_spelling = use_foreign_spelling
+        self.ensure_ascii = ensure_ascii
+        self._local = threading.local()
+
+    @property
+    def fingerprint(self) -> str:
+        """The configuration as a string, to tell apart cached romanizations"""
+        return (
+            f"{self.system}:foreign_spelling={self.use_foreign_spelling}"
+            f":ensure_ascii={self.ensure_ascii}"
+        )
+
+    @property
+    def cutlet(self) -> Cutlet:
+        """The Cutlet instance of the current thread, created on first access"""
+        katsu: Cutlet | None = getattr(self._local, "cutlet", None)
+        if katsu is None:
+            katsu = Cutlet(
+                self.system,
+                use_foreign_spelling=self.use_foreign_spelling,
+                ensure_ascii=self.ensure_ascii,
+            )
+            self._local.cutlet = katsu
+        return katsu
+
+    def warmup(self) -> None:
+        """
+        Load the tagger and dictionary of the current thread ahead of time, so
+        the first call to `romaji` does not pay for it.
+        """
+        self.romaji("準備")
+
+    def romaji(self, text: str, capitalize: bool = True, title: bool = False) -> str:
+        """
+        Romanize a Japanese text.
+
+        :param text: The text to romanize
+        :type text: str
+        :param capitalize: Whether to capitalize the first word, defaults to True
+        :type capitalize: bool, optional
+        :param title: Whether to capitalize the text as a title, defaults to False
+        :type title: bool, optional
+        :return: The romanized text
+        :rtype: str
+        """
+        return self.cutlet.romaji(text, capitalize=capitalize, title=title)  # type: ignore
+
+    def __repr__(self) -> str:
+        return (
+            f"Romanizer(system={self.system!r}, "
+            f"use_foreign_spelling={self.use_foreign_spelling!r}, "
+            f"ensure_ascii={self.ensure_ascii!r})"
+        )
+
+
+_romanizer = Romanizer()
+
+
+def get_romanizer() -> Romanizer:
+    """
+    Get the process-wide Romanizer used by `transliterate_no_accent`.
+
+    :return: The shared Romanizer
+    :rtype: Romanizer
+    """
+    return _romanizer
+
+
+def configure_romanizer(
+    system: RomajiSystem = "hepburn",
+    use_foreign_spelling: bool = True,
+    ensure_ascii: bool = True,
+) -> Romanizer:
+    """
+    Replace the process-wide Romanizer with a newly configured one.
+
+    :param system: The romanization system to use, defaults to "hepburn"
+    :type system: RomajiSystem, optional
+    :param use_foreign_spelling: Whether to use the original spelling of
+        loanwords, defaults to True
+    :type use_foreign_spelling: bool, optional
+    :param ensure_ascii: Whether to drop characters that can't be romanized,
+        defaults to True
+    :type ensure_ascii: bool, optional
+    :return: The new shared Romanizer
+    :rtype: Romanizer
+    """
+    global _romanizer
+    _romanizer = Romanizer(system, use_foreign_spelling, ensure_ascii)
+    return _romanizer
+
+
+def warmup_romanizer() -> None:
+    """Load the tagger of the process-wide Romanizer for the current thread"""
+    _romanizer.warmup()
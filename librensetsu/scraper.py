@@ -0,0 +1,192 @@
+"""Long-lived CloudScraper sessions with persisted Cloudflare clearance"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from cloudscraper import CloudScraper as CSP
+
+
+class ScraperPool:
+    """
+    One long-lived CloudScraper session per host.
+
+    Reusing a session keeps the cookies Cloudflare hands out once its
+    challenge is solved, so only the first request to a protected host pays
+    for it. The cookies with an expiry, along with the User-Agent they were
+    issued for, can be saved to a JSON file so later runs skip the challenge
+    too until the clearance expires.
+
+    Solving a challenge changes the state of the session, so requests sent
+    through the same session from several threads should be made while
+    holding the lock of its host, see `lock`.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Initialize the ScraperPool class.
+
+        :param path: JSON file to load the cookies from and save them to on
+            exit, defaults to None (memory only)
+        :type path: str | None, optional
+        """
+        self.path = path
+        self._scrapers: dict[str, CSP] = {}
+        self._host_locks: dict[str, threading.Lock] = {}
+        self._stored: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            if os.path.exists(path):
+                self.load(path)
+            atexit.register(self.save)
+
+    def get(self, url: str) -> CSP:
+        """
+        Get the session of the host of a URL, creating it on first use.
+
+        :param url: The URL to be requested.
+        :type url: str
+        :return: The CloudScraper session of the host.
+        :rtype: CloudScraper
+        """
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            scraper = self._scrapers.get(host)
+            if scraper is None:
+                scraper = CSP()
+                stored = self._stored.get(host)
+                if stored is not None:
+                    # Clearance cookies only hold for the User-Agent they were given to
+                    scraper.headers["User-Agent"] = stored["user_agent"]
+                    now = time.time()
+                    for cookie in stored["cookies"]:
+                        if cookie["expires"] > now:
+                            scraper.cookies.set(**cookie)
+                self._scrapers[host] = scraper
+                self._host_locks[host] = threading.Lock()
+            return scraper
+
+    def lock(self, url: str) -> threading.Lock:
+        """
+        Get the lock of the session of the host of a URL, to hold while
+        sending a request through it from concurrent threads.
+
+        :param url: The URL to be requested.
+        :type url: str
+        :return: The lock of the host.
+        :rtype: threading.Lock
+        """
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def _snapshot(self) -> dict[str, dict]:
+        """
+        Collect the unexpired cookies of every session, with their User-Agent.
+
+        :return: The cookies by host.
+        :rtype: dict[str, dict]
+        """
+        now = time.time()
+        hosts = dict(self._stored)
+        for host, scraper in self._scrapers.items():
+            hosts[host] = {
+                "user_agent": scraper.headers.get("User-Agent", ""),
+                "cookies": [
+                    {
+                        "name": cookie.name,
+                        "value": cookie.value,
+                        "domain": cookie.domain,
+                        "path": cookie.path,
+                        "expires": cookie.expires,
+                        "secure": cookie.secure,
+                    }
+                    for cookie in scraper.cookies
+                    if cookie.expires is not None and cookie.expires > now
+                ],
+            }
+        return {
+            host: stored
+            for host, stored in hosts.items()
+            if any(cookie["expires"] > now for cookie in stored["cookies"])
+        }
+
+    def save(self, path: str | None = None) -> None:
+        """
+        Write the cookies to a JSON file, atomically.
+
+        :param path: The file to write to, defaults to the path of the pool
+        :type path: str | None, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the cookies to")
+        with self._lock:
+            hosts = self._snapshot()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"version": 1, "hosts": hosts}, file)
+        os.replace(tmp, path)
+
+    def load(self, path: str | None = None) -> None:
+        """
+        Read the cookies stored in a JSON file, for sessions created later.
+
+        :param path: The file to read from, defaults to the path of the pool
+        :type path: str | None, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to load the cookies from")
+        with open(path, "r", encoding="utf-8") as file:
+            hosts = json.load(file)["hosts"]
+        with self._lock:
+            self._stored.update(hosts)
+
+    def close(self) -> None:
+        """Save the cookies to the path of the pool, if any, and close the sessions"""
+        if self.path is not None:
+            atexit.unregister(self.save)
+            self.save()
+        with self._lock:
+            scrapers, self._scrapers = self._scrapers, {}
+        for scraper in scrapers.values():
+            scraper.close()
+
+    def __len__(self) -> int:
+        return len(self._scrapers)
+
+    def __repr__(self) -> str:
+        return f"ScraperPool(path={self.path!r})"
+
+
+_scraper_pool = ScraperPool()
+
+
+def get_scraper_pool() -> ScraperPool:
+    """
+    Get the process-wide ScraperPool used by Downloader.
+
+    :return: The shared ScraperPool
+    :rtype: ScraperPool
+    """
+    return _scraper_pool
+
+
+def configure_scraper_pool(path: str | None = None) -> ScraperPool:
+    """
+    Replace the process-wide ScraperPool, closing the previous one.
+
+    :param path: JSON file to persist the clearance cookies to, defaults to
+        None (memory only)
+    :type path: str | None, optional
+    :return: The new shared ScraperPool
+    :rtype: ScraperPool
+    """
+    global _scraper_pool
+    _scraper_pool.close()
+    _scraper_pool = ScraperPool(path)
+    return _scraper_pool
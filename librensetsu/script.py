@@ -0,0 +1,42 @@
+"""Detection of Japanese script in texts"""
+
+import re
+
+JAPANESE_RANGES: tuple[tuple[int, int], ...] = (
+    (0x3005, 0x3007),  # Iteration mark, closing mark, ideographic zero
+    (0x3040, 0x309F),  # Hiragana
+    (0x30A0, 0x30FF),  # Katakana
+    (0x31F0, 0x31FF),  # Katakana Phonetic Extensions
+    (0x3400, 0x4DBF),  # CJK Unified Ideographs Extension A
+    (0x4E00, 0x9FFF),  # CJK Unified Ideographs
+    (0xF900, 0xFAFF),  # CJK Compatibility Ideographs
+    (0xFF66, 0xFF9F),  # Halfwidth Katakana
+)
+"""Code point ranges of kana and kanji, inclusive"""
+
+_CHARS = "".join(f"\\u{start:04x}-\\u{end:04x}" for start, end in JAPANESE_RANGES)
+
+JAPANESE_SEGMENT = re.compile(f"[{_CHARS}]+(?:[\\s\\u3000-\\u3004]+[{_CHARS}]+)*")
+"""Runs of kana and kanji, including the spaces and punctuation between them"""
+
+
+def has_japanese(text: str) -> bool:
+    """
+    Check whether a text contains kana or kanji
+    :param text: The text to check
+    :type text: str
+    :return: Whether the text contains kana or kanji
+    :rtype: bool
+    """
+    return JAPANESE_SEGMENT.search(text) is not None
+
+
+def japanese_segments(text: str) -> list[str]:
+    """
+    Find the runs of kana and kanji in a text
+    :param text: The text to search
+    :type text: str
+    :return: The Japanese segments, in order of appearance
+    :rtype: list[str]
+    """
+    return JAPANESE_SEGMENT.findall(text)
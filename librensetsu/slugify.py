@@ -1,12 +1,85 @@
 """Module for slugifying the text"""
 
 import re
+from functools import partial
+from typing import Iterable
 
-from .transliterate import transliterate_no_accent
+from .cache import ResultCache
+from .parallel import map_unique
+from .transliterate import _romanize, _romanizer_key, transliterate_no_accent
+
+SlugifyKey = tuple[str, bool, bool, bool | None, str]
+"""
+Cache key of slugify: text, non_alphanum_as_dash, transliterate, is_japanese,
+romanizer fingerprint
+"""
+
+_CACHE_FINGERPRINT = (
+    "slugify:text,non_alphanum_as_dash,transliterate,is_japanese,romanizer"
+)
+"""Layout of the cache keys, so files saved with another one are ignored"""
+
+_NON_WORD = re.compile(r"[\W_]+")
+"""Runs of non-alphanumeric characters, collapsed into a dash"""
+_SYMBOLS = re.compile(r"[^\w\s]+")
+"""Runs of symbols, dropped unless they count as separators"""
+_SEPARATORS = re.compile(r"[\s_]+")
+"""Runs of whitespace and underscores, collapsed into a dash"""
+
+_cache: ResultCache[SlugifyKey, str] | None = None
+
+
+def enable_slugify_cache(
+    maxsize: int = 65536, path: str | None = None
+) -> ResultCache[SlugifyKey, str]:
+    """
+    Cache the results of `slugify` and `slugify_many`
+
+    :param maxsize: Maximum number of results to keep, defaults to 65536
+    :type maxsize: int, optional
+    :param path: JSON file to load the cache from and save it to on exit,
+        defaults to None (memory only)
+    :type path: str | None, optional
+    :return: The cache, to inspect its statistics or save it manually
+    :rtype: ResultCache[SlugifyKey, str]
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = ResultCache(maxsize, path, _CACHE_FINGERPRINT)
+    return _cache
+
+
+def disable_slugify_cache() -> None:
+    """Stop caching the results of `slugify`"""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
+
+
+def _slugify(
+    text: str,
+    non_alphanum_as_dash: bool,
+    transliterate: bool,
+    is_japanese: bool | None,
+) -> str:
+    lower = text.lower().strip()
+    if transliterate:
+        # Cutlet capitalizes sentences and proper nouns, so lowercase its
+        # output before the char_maps, which may map to capitals themselves
+        lower = transliterate_no_accent(_romanize(lower, is_japanese, lower=True))
+    if non_alphanum_as_dash:
+        # Symbols become dashes and merge with the surrounding separators
+        return _NON_WORD.sub("-", lower).strip("-")
+    return _SEPARATORS.sub("-", _SYMBOLS.sub("", lower)).strip("-")
 
 
 def slugify(
-    text: str, non_alphanum_as_dash: bool = False, transliterate: bool = True
+    text: str,
+    non_alphanum_as_dash: bool = False,
+    transliterate: bool = True,
+    is_japanese: bool | None = False,
 ) -> str:
     """
     Slugify the text
@@ -17,17 +90,60 @@ def slugify(
     :type non_alphanum_as_dash: bool, optional
     :param transliterate: Transliterate the text, defaults to True
     :type transliterate: bool, optional
+    :param is_japanese: Romanize the text as Japanese when transliterating, or None to detect it, defaults to False
+    :type is_japanese: bool | None, optional
     :return: The slugified text
     :rtype: str
     """
+    if _cache is None:
+        return _slugify(text, non_alphanum_as_dash, transliterate, is_japanese)
+    romanizer = _romanizer_key(is_japanese) if transliterate else ""
+    key = (text, non_alphanum_as_dash, transliterate, is_japanese, romanizer)
+    slug = _cache.get(key)
+    if slug is None:
+        slug = _slugify(text, non_alphanum_as_dash, transliterate, is_japanese)
+        _cache.put(key, slug)
+    return slug
 
-    naad = non_alphanum_as_dash
-    """Alias for non_alphanum_as_dash"""
 
-    lower = text.lower().strip()
-    if transliterate:
-        lower = transliterate_no_accent(lower)
-    drop = re.sub(r"[^\w\s]", "-" if naad else "", lower)
-    dash = re.sub(r"[\s_\-]+", "-", drop)
-    trim_corner = re.sub(r"^-+|-+$", "", dash)
-    return trim_corner
+def slugify_many(
+    texts: Iterable[str],
+    non_alphanum_as_dash: bool = False,
+    transliterate: bool = True,
+    is_japanese: bool | None = False,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+) -> list[str]:
+    """
+    Slugify many texts at once
+
+    Duplicate texts are only slugified once, and large batches are spread
+    across a process pool.
+
+    :param texts: The texts to be slugified
+    :type texts: Iterable[str]
+    :param non_alphanum_as_dash: Replace non-alphanumeric characters with dash, defaults to False
+    :type non_alphanum_as_dash: bool, optional
+    :param transliterate: Transliterate the text, defaults to True
+    :type transliterate: bool, optional
+    :param is_japanese: Romanize the texts as Japanese when transliterating, or None to detect it, defaults to False
+    :type is_japanese: bool | None, optional
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :type workers: int | None, optional
+    :param chunk_size: Number of texts sent to a worker at once, defaults to 1000
+    :type chunk_size: int, optional
+    :return: The slugified texts, in the same order as the input
+    :rtype: list[str]
+    """
+    func = partial(
+        _slugify,
+        non_alphanum_as_dash=non_alphanum_as_dash,
+        transliterate=transliterate,
+        is_japanese=is_japanese,
+    )
+    romanizer = _romanizer_key(is_japanese) if transliterate else ""
+
+    def key(text: str) -> SlugifyKey:
+        return (text, non_alphanum_as_dash, transliterate, is_japanese, romanizer)
+
+    return map_unique(func, texts, workers, chunk_size, _cache, key)
@@ -2,7 +2,14 @@
 # Taken from https://github.com/foswiki/distro/blob/2e25bfef2c500a78ff7c2c394373cf15286bfaf2/JQueryPlugin/pub/System/JQueryPlugin/plugins/wikiword/downgradeMap.uncompressed.js
 # Description: This file contains the language mappings for the language codes.
 
-from cutlet import Cutlet
+import re
+from functools import partial
+from typing import Any, Iterable
+
+from .cache import ResultCache
+from .parallel import map_unique
+from .romanizer import get_romanizer
+from .script import JAPANESE_SEGMENT
 
 char_maps = {
     "©": "(c)", "®": "(r)", "·": "*", "း": ":", "ៈ": "a`", "ঃ": "H", "ཿ": "H",
@@ -667,18 +674,332 @@ char_maps = {
     "龙": "Long ", "龟": "Gui ",
 }
 
-def transliterate_no_accent(text: str, is_japanese: bool = False) -> str:
+
+class CharMapTransliterator:
+    """
+    Compiled replacement engine for a transliteration mapping.
+
+    Applying a mapping with one ``str.replace`` per entry scans the text once
+    for every key. This engine compiles the same mapping into a translation
+    table for single code points and a longest-match trie, rendered as a
+    regular expression, for multi-character keys, so a text is processed in
+    one or a few C-level passes while producing the exact same output as the
+    ordered replace loop.
+    """
+
+    def __init__(self, mapping: dict[str, str]) -> None:
+        """
+        Compile the mapping.
+
+        :param mapping: Ordered mapping of source strings to their replacement
+        :type mapping: dict[str, str]
+        """
+        self.mapping = dict(mapping)
+        order = {key: index for index, key in enumerate(self.mapping)}
+        singles = {k: v for k, v in self.mapping.items() if len(k) == 1}
+        # A multi-character key is unreachable once any of its characters has
+        # been replaced by an earlier single-character key.
+        multis = [
+            k
+            for k in self.mapping
+            if len(k) > 1
+            and not any(c in singles and order[c] < order[k] for c in k)
+        ]
+        self._table = str.maketrans(singles)
+        self._exact = self._is_order_independent(
+            singles, multis
+        ) and self._is_leftmost_longest(multis, order)
+        self._stages: list[tuple[re.Pattern[str] | None, dict[int, Any]]] = []
+        self._merged: re.Pattern[str] | None = None
+        self._strip: dict[int, Any] = {}
+        self._barrier: re.Pattern[str] | None = None
+        if not self._exact or not multis:
+            return
+
+        # Deleting a character can join its neighbours into a match for a
+        # later multi-character key, so deletions that sit in between
+        # multi-character keys are applied in between their passes.
+        first, last = order[multis[0]], order[multis[-1]]
+        deletions = [k for k, v in singles.items() if v == "" and order[k] < last]
+        group: list[str] = []
+        for key in sorted(multis + deletions, key=order.__getitem__):
+            if key in singles:
+                if group:
+                    self._stages.append((self._compile_trie(group), {}))
+                    group = []
+                self._stages.append((None, {ord(key): None}))
+            else:
+                group.append(key)
+        self._stages.append((self._compile_trie(group), {}))
+        # Without those in-between deletions in the text, all passes collapse
+        # into a single one over every multi-character key.
+        self._merged = self._compile_trie(multis)
+        self._strip = {ord(k): None for k in deletions if order[k] < first}
+        barrier = "".join(k for k in deletions if order[k] > first)
+        if barrier:
+            self._barrier = re.compile(f"[{re.escape(barrier)}]")
+
+    def _is_order_independent(self, singles: dict[str, str], multis: list[str]) -> bool:
+        """
+        Check that no replacement can feed another key.
+
+        :param singles: The single-character entries of the mapping
+        :type singles: dict[str, str]
+        :param multis: The reachable multi-character keys
+        :type multis: list[str]
+        :return: Whether replacements can be applied in any order
+        :rtype: bool
+        """
+        for value in self.mapping.values():
+            if any(c in singles for c in value):
+                return False
+            if not value:
+                continue
+            for key in multis:
+                if key in value:
+                    return False
+                for size in range(1, len(key)):
+                    if value.endswith(key[:size]) or value.startswith(key[-size:]):
+                        return False
+        return True
+
+    @staticmethod
+    def _is_leftmost_longest(multis: list[str], order: dict[str, int]) -> bool:
+        """
+        Check that a leftmost-longest scan picks the same matches as the
+        ordered replace loop.
+
+        :param multis: The reachable multi-character keys
+        :type multis: list[str]
+        :param order: Position of every key in the mapping
+        :type order: dict[str, int]
+        :return: Whether every overlapping pair favours the earlier key
+        :rtype: bool
+        """
+        for head in multis:
+            for tail in multis:
+                if head == tail:
+                    continue
+                if tail in head and order[tail] < order[head]:
+                    return False
+                overlaps = any(
+                    head[-size:] == tail[:size]
+                    for size in range(1, min(len(head), len(tail)))
+                )
+                if overlaps and order[tail] < order[head]:
+                    return False
+        return True
+
+    def _compile_trie(self, keys: list[str]) -> re.Pattern[str] | None:
+        """
+        Compile the keys into a trie-shaped, longest-match regular expression.
+
+        :param keys: The multi-character keys to match
+        :type keys: list[str]
+        :return: The compiled pattern, or None if there are no keys
+        :rtype: re.Pattern[str] | None
+        """
+        if not keys:
+            return None
+        trie: dict[str, Any] = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        def render(node: dict[str, Any]) -> str:
+            branches = [
+                re.escape(char) + render(child)
+                for char, child in sorted(node.items())
+                if char
+            ]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            # Greedy optional group tries the longer key before the shorter one
+            return f"(?:{body})?" if "" in node else body
+
+        return re.compile(render(trie))
+
+    def _replace(self, match: re.Match[str]) -> str:
+        return self.mapping[match.group()]
+
+    def transliterate(self, text: str) -> str:
+        """
+        Apply the mapping to the text.
+
+        :param text: The text to transliterate
+        :type text: str
+        :return: The transliterated text
+        :rtype: str
+        """
+        if not self._exact:
+            for k, v in self.mapping.items():
+                text = text.replace(k, v)
+            return text
+        if self._merged is not None:
+            if self._barrier is None or not self._barrier.search(text):
+                text = self._merged.sub(self._replace, text.translate(self._strip))
+            else:
+                for pattern, table in self._stages:
+                    if pattern is None:
+                        text = text.translate(table)
+                    else:
+                        text = pattern.sub(self._replace, text)
+        return text.translate(self._table)
+
+    __call__ = transliterate
+
+
+_compiled_char_maps: CharMapTransliterator | None = None
+
+
+def compile_char_maps() -> CharMapTransliterator:
+    """
+    (Re)compile `char_maps` into the engine used by `transliterate_no_accent`.
+
+    The engine is compiled lazily on first use; call this again after
+    modifying `char_maps` so the changes are picked up.
+    :return: The compiled engine
+    :rtype: CharMapTransliterator
+    """
+    global _compiled_char_maps
+    _compiled_char_maps = CharMapTransliterator(char_maps)
+    return _compiled_char_maps
+
+
+TransliterateKey = tuple[str, bool | None, str]
+"""Cache key of transliterate_no_accent: text, is_japanese, romanizer fingerprint"""
+
+_CACHE_FINGERPRINT = "transliterate:text,is_japanese,romanizer"
+"""Layout of the cache keys, so files saved with another one are ignored"""
+
+_cache: ResultCache[TransliterateKey, str] | None = None
+
+
+def enable_transliterate_cache(
+    maxsize: int = 65536, path: str | None = None
+) -> ResultCache[TransliterateKey, str]:
+    """
+    Cache the results of `transliterate_no_accent` and `transliterate_many`
+    :param maxsize: Maximum number of results to keep, defaults to 65536
+    :type maxsize: int, optional
+    :param path: JSON file to load the cache from and save it to on exit,
+        defaults to None (memory only)
+    :type path: str | None, optional
+    :return: The cache, to inspect its statistics or save it manually
+    :rtype: ResultCache[TransliterateKey, str]
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = ResultCache(maxsize, path, _CACHE_FINGERPRINT)
+    return _cache
+
+
+def disable_transliterate_cache() -> None:
+    """Stop caching the results of `transliterate_no_accent`"""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
+
+
+def _romanizer_key(is_japanese: bool | None) -> str:
+    """
+    Get the part of cache keys telling which romanizer configuration a
+    result depends on.
+    :param is_japanese: Whether the text is Japanese, or None to detect it
+    :type is_japanese: bool | None
+    :return: The fingerprint of the romanizer, empty if it is not used
+    :rtype: str
+    """
+    return "" if is_japanese is False else get_romanizer().fingerprint
+
+
+def _romanize(text: str, is_japanese: bool | None, lower: bool = False) -> str:
+    """
+    Romanize a text as Japanese, or only its kana and kanji segments
+    :param text: The text to romanize
+    :type text: str
+    :param is_japanese: Whether the text is Japanese, or None to detect the
+        kana and kanji segments and only romanize those
+    :type is_japanese: bool | None
+    :param lower: Whether to lowercase the romanized segments, defaults to False
+    :type lower: bool, optional
+    :return: The romanized text
+    :rtype: str
+    """
+    if is_japanese is False:
+        return text
+    romanizer = get_romanizer()
+
+    def romaji(segment: str) -> str:
+        result = romanizer.romaji(segment)
+        return result.lower() if lower else result
+
+    if is_japanese is None:
+        return JAPANESE_SEGMENT.sub(lambda match: romaji(match.group()), text)
+    return romaji(text)
+
+
+def _transliterate(text: str, is_japanese: bool | None = False) -> str:
+    text = _romanize(text, is_japanese)
+    engine = _compiled_char_maps or compile_char_maps()
+    return engine.transliterate(text)
+
+
+def transliterate_no_accent(text: str, is_japanese: bool | None = False) -> str:
     """
     Transliterate a text to Latin alphanumeric without accent marks
     :param text: The text to transliterate
     :type text: str
-    :param is_japanese: Whether the text is Japanese
-    :type is_japanese: bool
+    :param is_japanese: Whether the text is Japanese, or None to detect the
+        kana and kanji segments and only romanize those
+    :type is_japanese: bool | None
     :return: The transliterated text
     :rtype: str
     """
-    if is_japanese:
-        text = Cutlet().romaji(text)  # type: ignore
-    for k, v in char_maps.items():
-        text = text.replace(k, v)
-    return text
+    if _cache is None:
+        return _transliterate(text, is_japanese)
+    key = (text, is_japanese, _romanizer_key(is_japanese))
+    result = _cache.get(key)
+    if result is None:
+        result = _transliterate(text, is_japanese)
+        _cache.put(key, result)
+    return result
+
+
+def transliterate_many(
+    texts: Iterable[str],
+    is_japanese: bool | None = False,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+) -> list[str]:
+    """
+    Transliterate many texts at once, see `transliterate_no_accent`
+
+    Duplicate texts are only transliterated once, and large batches are spread
+    across a process pool.
+    :param texts: The texts to transliterate
+    :type texts: Iterable[str]
+    :param is_japanese: Whether the texts are Japanese, or None to detect it
+    :type is_japanese: bool | None
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :type workers: int | None, optional
+    :param chunk_size: Number of texts sent to a worker at once, defaults to 1000
+    :type chunk_size: int, optional
+    :return: The transliterated texts, in the same order as the input
+    :rtype: list[str]
+    """
+    func = partial(_transliterate, is_japanese=is_japanese)
+    romanizer = _romanizer_key(is_japanese)
+    return map_unique(
+        func,
+        texts,
+        workers,
+        chunk_size,
+        _cache,
+        lambda text: (text, is_japanese, romanizer),
+    )